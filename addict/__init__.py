@@ -1,5 +1,16 @@
-from .addict import Dict
+from .addict import Dict, CompactDict, ReadDict, iter_json_lines
 from .addict import Dict as Addict
+from .aggregate import Aggregator
+from .collection import Collection
+from .columns import from_columns, to_columns
+from .concurrent import ConcurrentDict
+from .diff import apply_patch, checkpoint, diff, track, untrack
+from .frozen import FrozenDict
+from .instrument import Profiler
+from .merge import Merger, merge
+from .parallel import convert_many, to_dicts
+from .schema import compile_schema
+from .snapshot import SnapshotDict, open_snapshot, write_snapshot
 
 
 __title__ = 'addict'
@@ -7,4 +18,16 @@ __version__ = '2.4.0'
 __author__ = 'Mats Julian Olsen'
 __license__ = 'MIT'
 __copyright__ = 'Copyright 2014-2020 Mats Julian Olsen'
-__all__ = ['Dict']
+__all__ = ['Aggregator', 'Collection', 'Dict', 'CompactDict',
+           'ConcurrentDict', 'FrozenDict', 'Merger', 'Profiler', 'ReadDict',
+           'SnapshotDict', 'apply_patch', 'checkpoint', 'compile_schema',
+           'convert_many', 'diff', 'from_columns', 'iter_json_lines', 'merge',
+           'open_snapshot', 'to_columns', 'to_dicts', 'track', 'untrack',
+           'write_snapshot']
+
+try:
+    from .aio import aiter_ndjson
+except SyntaxError:  # Python 2
+    pass
+else:
+    __all__.append('aiter_ndjson')
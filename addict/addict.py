@@ -1,12 +1,42 @@
 import copy
+import json
+import pickle
+
+try:
+    import copyreg
+except ImportError:  # Python 2
+    import copy_reg as copyreg
+
+try:
+    from functools import lru_cache
+except ImportError:  # Python 2
+    lru_cache = None
+
+try:
+    from sys import intern as _intern
+    _INTERNABLE = frozenset([str])
+except ImportError:  # Python 2, where intern is a builtin that takes str only
+    _unicode_keys = {}
+    _INTERNABLE = frozenset([str, unicode])
+
+    def _intern(key):
+        if type(key) is str:
+            return intern(key)
+        return _unicode_keys.setdefault(key, key)
 
 
 class Dict(dict):
+    # Bookkeeping defaults live on the class, so an attached, unfrozen Dict
+    # carries no instance state and writes only check two class attributes.
+    # __parent is the (parent, key) pair a detached child attaches to.
+    __parent = None
+    __frozen = False
 
     def __init__(__self, *args, **kwargs):
-        object.__setattr__(__self, '__parent', kwargs.pop('__parent', None))
-        object.__setattr__(__self, '__key', kwargs.pop('__key', None))
-        object.__setattr__(__self, '__frozen', False)
+        parent = kwargs.pop('__parent', None)
+        key = kwargs.pop('__key', None)
+        if parent is not None:
+            object.__setattr__(__self, '_Dict__parent', (parent, key))
         for arg in args:
             if not arg:
                 continue
@@ -30,21 +60,16 @@ class Dict(dict):
             self[name] = value
 
     def __setitem__(self, name, value):
-        isFrozen = (hasattr(self, '__frozen') and
-                    object.__getattribute__(self, '__frozen'))
-        if isFrozen and name not in super(Dict, self).keys():
-                raise KeyError(name)
-        super(Dict, self).__setitem__(name, value)
-        try:
-            p = object.__getattribute__(self, '__parent')
-            key = object.__getattribute__(self, '__key')
-        except AttributeError:
-            p = None
-            key = None
-        if p is not None:
-            p[key] = self
-            object.__delattr__(self, '__parent')
-            object.__delattr__(self, '__key')
+        if self.__frozen and name not in self:
+            raise KeyError(name)
+        dict.__setitem__(self, name, value)
+        if self.__parent is not None:
+            self.__attach()
+
+    def __attach(self):
+        parent, key = self.__parent
+        parent[key] = self
+        object.__setattr__(self, '_Dict__parent', None)
 
     def __add__(self, other):
         if not self.keys():
@@ -57,6 +82,8 @@ class Dict(dict):
 
     @classmethod
     def _hook(cls, item):
+        if _plain(cls):
+            return _convert(item, cls, dict)
         if isinstance(item, dict):
             return cls(item)
         elif isinstance(item, (list, tuple)):
@@ -67,7 +94,7 @@ class Dict(dict):
         return self.__getitem__(item)
 
     def __missing__(self, name):
-        if object.__getattribute__(self, '__frozen'):
+        if self.__frozen:
             raise KeyError(name)
         return self.__class__(__parent=self, __key=name)
 
@@ -75,6 +102,8 @@ class Dict(dict):
         del self[name]
 
     def to_dict(self):
+        if _plain(type(self)):
+            return _convert(self, dict, type(self))
         base = {}
         for key, value in self.items():
             if isinstance(value, type(self)):
@@ -93,6 +122,15 @@ class Dict(dict):
     def deepcopy(self):
         return copy.deepcopy(self)
 
+    def lazy_copy(self):
+        # A deep copy that is a lazy Dict over plain copies of the mappings,
+        # lists and tuples of self, taken once by _convert. Nothing in the
+        # copy can be reached from self, so writes through either side, or
+        # through nested Dicts looked up before, stay on that side. The copy
+        # is O(n) like deepcopy(), but only builds Dicts along the paths it
+        # reads.
+        return _lazy_class(type(self))(_convert(self, dict, dict))
+
     def __deepcopy__(self, memo):
         other = self.__class__()
         memo[id(self)] = other
@@ -101,28 +139,41 @@ class Dict(dict):
         return other
 
     def update(self, *args, **kwargs):
-        other = {}
-        if args:
-            if len(args) > 1:
-                raise TypeError()
-            other.update(args[0])
-        other.update(kwargs)
-        for k, v in other.items():
-            if ((k not in self) or
-                (not isinstance(self[k], dict)) or
-                (not isinstance(v, dict))):
-                self[k] = v
-            else:
-                self[k].update(v)
+        # Nested Dicts are merged on a stack rather than through recursive
+        # update calls; other dicts, and Dicts with an update of their own,
+        # are updated by their own method.
+        if len(args) > 1:
+            raise TypeError()
+        if args and kwargs:
+            other = dict(args[0], **kwargs)
+        else:
+            other = args[0] if args else kwargs
+            if not isinstance(other, dict):
+                other = dict(other)
+        stack = [(self, other)]
+        while stack:
+            node, other = stack.pop()
+            for key, value in other.items():
+                current = node.get(key, _MISSING)
+                if not (isinstance(value, dict) and
+                        isinstance(current, dict)):
+                    node[key] = value
+                # == rather than is: Python 2 builds a new unbound method
+                # on each lookup
+                elif type(current).update == Dict.update:
+                    stack.append((current, value))
+                else:
+                    current.update(value)
 
-    def __getnewargs__(self):
-        return tuple(self.items())
+    def __copy__(self):
+        new = self.__class__.__new__(self.__class__)
+        dict.update(new, self)
+        return new
 
-    def __getstate__(self):
-        return self
+    def __reduce_ex__(self, protocol):
+        return _reduce(self, type(self), protocol)
 
-    def __setstate__(self, state):
-        self.update(state)
+    __setstate__ = dict.update
 
     def __or__(self, other):
         if not isinstance(other, (Dict, dict)):
@@ -150,10 +201,896 @@ class Dict(dict):
             return default
 
     def freeze(self, shouldFreeze=True):
-        object.__setattr__(self, '__frozen', shouldFreeze)
-        for key, val in self.items():
-            if isinstance(val, Dict):
-                val.freeze(shouldFreeze)
+        # a Dict reachable twice, or from itself, is only visited once
+        stack = [self]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            object.__setattr__(node, '_Dict__frozen', shouldFreeze)
+            stack.extend(val for val in node.values()
+                         if isinstance(val, (Dict, CompactDict)))
 
     def unfreeze(self):
         self.freeze(False)
+
+    @classmethod
+    def lazy(cls, *args, **kwargs):
+        return _lazy_class(cls)(*args, **kwargs)
+
+    @classmethod
+    def interned_class(cls):
+        # cls with its str keys interned; see _InternedKeys
+        return _interned_class(cls)
+
+    @classmethod
+    def probing_class(cls, names='private'):
+        # cls where reading a missing attribute named like names raises
+        # AttributeError instead of creating a child; see _Probing
+        return _probing_class(cls, names)
+
+    @classmethod
+    def from_json(cls, source, **kwargs):
+        kwargs['object_pairs_hook'] = cls._from_pairs
+        if hasattr(source, 'read'):
+            return json.load(source, **kwargs)
+        return json.loads(source, **kwargs)
+
+    @classmethod
+    def afrom_stream(cls, reader, **kwargs):
+        # from_json for an asyncio stream, as a coroutine; see addict.aio
+        from .aio import afrom_stream
+        return afrom_stream(reader, dict_class=cls, **kwargs)
+
+    def get_path(self, path, default=None):
+        node = _find(self, _parse_path(path))
+        return default if node is _MISSING else node
+
+    def set_path(self, path, value):
+        keys = _parse_path(path)
+        _assign(_find(self, keys[:-1], self.__class__), keys[-1], value)
+
+    def get_many(self, paths, default=None):
+        # paths with the same parent share the walk to it
+        parents = {}
+        values = []
+        for path in paths:
+            keys = _parse_path(path)
+            prefix = keys[:-1]
+            try:
+                parent = parents[prefix]
+            except KeyError:
+                parent = parents[prefix] = _find(self, prefix)
+            value = _find(parent, keys[-1:])
+            values.append(default if value is _MISSING else value)
+        return values
+
+    def set_many(self, values):
+        parents = {}
+        items = values.items() if isinstance(values, dict) else values
+        for path, value in items:
+            keys = _parse_path(path)
+            prefix = keys[:-1]
+            try:
+                parent = parents[prefix]
+            except KeyError:
+                parent = parents[prefix] = _find(self, prefix,
+                                                 self.__class__)
+            if isinstance(_find(parent, keys[-1:]), (dict, list, tuple)):
+                # a container some cached parent may live in is replaced
+                parents.clear()
+            _assign(parent, keys[-1], value)
+
+    def to_json(self, **kwargs):
+        return json.dumps(self, **kwargs)
+
+    def dump(self, fp, chunk_size=None, encoding=None, **kwargs):
+        # Serialises straight from the Dict, without a to_dict copy. With
+        # chunk_size, output goes out in pieces of about that many characters
+        # instead of as one string; fp may be a file or a socket, which is
+        # sent UTF-8 unless another encoding is given.
+        write = getattr(fp, 'write', None)
+        if write is None:
+            write = fp.sendall
+            encoding = encoding or 'utf-8'
+        if chunk_size is None:
+            chunks = [self.to_json(**kwargs)]
+        else:
+            encoder = kwargs.pop('cls', None) or json.JSONEncoder
+            chunks = _rechunk(encoder(**kwargs).iterencode(self), chunk_size)
+        for chunk in chunks:
+            write(chunk.encode(encoding) if encoding else chunk)
+
+    @classmethod
+    def _from_pairs(cls, pairs):
+        # the decoder builds objects innermost first, so the values are
+        # already converted and must not go through _hook again
+        new = cls()
+        dict.update(new, pairs)
+        return new
+
+
+def iter_json_lines(lines, dict_class=Dict, **kwargs):
+    kwargs['object_pairs_hook'] = dict_class._from_pairs
+    for line in lines:
+        if line.strip():
+            yield json.loads(line, **kwargs)
+
+
+_MISSING = object()
+
+try:
+    _STRINGS = (str, unicode)
+except NameError:  # Python 3
+    _STRINGS = (str,)
+
+
+def _split_path(path):
+    if isinstance(path, _STRINGS):
+        keys = tuple(path.split('.'))
+    else:
+        keys = tuple(path)
+    if not keys:
+        raise ValueError('empty path')
+    return keys
+
+
+if lru_cache is not None:
+    _cached_split_path = lru_cache(maxsize=4096)(_split_path)
+else:
+    _cached_split_path = _split_path
+
+
+def _parse_path(path):
+    # 'a.b.0' or an iterable of keys, for keys that are not strings or
+    # contain dots; parsed string and tuple paths are cached
+    if isinstance(path, _STRINGS + (tuple,)):
+        return _cached_split_path(path)
+    return _split_path(path)
+
+
+def _find(node, keys, create=None):
+    # Walks keys from node without auto-vivification. Returns _MISSING if a
+    # key is absent, or, with create, fills the gap with create() nodes.
+    for key in keys:
+        if isinstance(node, dict):
+            child = node.get(key, _MISSING)
+            if child is _MISSING and create is not None:
+                child = create()
+                node[key] = child
+        elif isinstance(node, (list, tuple)):
+            try:
+                child = node[int(key)]
+            except (ValueError, IndexError):
+                if create is not None:
+                    raise
+                child = _MISSING
+        elif create is not None:
+            raise TypeError("cannot set '{0}' on {1!r}".format(key, node))
+        else:
+            child = _MISSING
+        if child is _MISSING:
+            return _MISSING
+        node = child
+    return node
+
+
+def _assign(node, key, value):
+    if isinstance(node, list):
+        node[int(key)] = value
+    elif isinstance(node, dict):
+        node[key] = value
+    else:
+        raise TypeError("cannot set '{0}' on {1!r}".format(key, node))
+
+
+def _reduce(node, cls, protocol):
+    # The items travel as the state of an empty instance and are put back
+    # with dict.update, so unpickling runs no Python code per node. That is
+    # what makes shipping Dicts between processes cheap. Frozen nodes and
+    # nodes pickled as another class are restored through _restore, and
+    # with protocol 5 large bytes values are sent as out-of-band buffers.
+    state = dict(node)
+    if protocol >= 5:
+        _out_of_band(state)
+    if node._Dict__frozen or cls is not type(node):
+        return _restore, (cls, state, node._Dict__frozen)
+    return copyreg.__newobj__, (cls,), state
+
+
+_OUT_OF_BAND_SIZE = 1 << 16
+_BUFFER_TYPES = frozenset([bytes, bytearray])
+
+
+def _out_of_band(state):
+    # Passes large bytes and bytearray values as PickleBuffers, which pickle
+    # hands to the buffer_callback instead of copying them into the stream.
+    # A bytearray comes back as the buffer given to loads; bytes are copied
+    # out of it so that they stay bytes.
+    if _BUFFER_TYPES.isdisjoint(map(type, state.values())):
+        return
+    for key, value in state.items():
+        if (type(value) in _BUFFER_TYPES and
+                len(value) >= _OUT_OF_BAND_SIZE):
+            state[key] = (_OutOfBand(value) if type(value) is bytes
+                          else pickle.PickleBuffer(value))
+
+
+class _OutOfBand(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __reduce_ex__(self, protocol):
+        return bytes, (pickle.PickleBuffer(self.value),)
+
+
+def _restore(cls, state, frozen):
+    new = cls.__new__(cls)
+    dict.update(new, state)
+    if frozen:
+        object.__setattr__(new, '_Dict__frozen', True)
+    return new
+
+
+def _rechunk(pieces, size):
+    buffered = []
+    length = 0
+    for piece in pieces:
+        buffered.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffered)
+            buffered = []
+            length = 0
+    if buffered:
+        yield ''.join(buffered)
+
+
+_plain_classes = {}
+
+
+def _plain(cls):
+    # Whether cls builds and converts nodes with Dict's own __init__, _hook
+    # and to_dict. Only then does _convert build or copy a whole tree on its
+    # stack; a class that overrides one of them gets it called per node.
+    # The overrides of _LazyDict do not count, as lazy classes convert with
+    # _convert too.
+    try:
+        return _plain_classes[cls]
+    except KeyError:
+        plain = _plain_classes[cls] = all(
+            _lookup(cls, name) is vars(Dict)[name]
+            for name in ('__init__', '_hook', 'to_dict'))
+        return plain
+
+
+def _lookup(cls, name):
+    for base in cls.__mro__:
+        if name in vars(base) and base is not _LazyDict:
+            return vars(base)[name]
+
+
+def _convert(item, new_mapping, mappings, _paths=False):
+    # Copies item, turning instances of `mappings` into new_mapping() and
+    # cloning lists and tuples. The walk uses an explicit stack, so nesting
+    # depth is only limited by memory. Sequences are filled as lists and
+    # turned into their own type once all of their children are done.
+    # Only containers with containers in them can be part of a cycle, so
+    # only their ids are kept in `seen`. If one comes up twice, it is
+    # either shared or in a cycle, and the copy starts over with _paths,
+    # where `seen` holds the containers on the current path instead: a
+    # (source, None) entry takes source off once its children are done.
+    if isinstance(item, mappings):
+        root = new_mapping()
+    elif isinstance(item, (list, tuple)):
+        root = []
+    else:
+        return item
+    stack = [(item, root)]
+    sequences = []
+    seen = set()
+    while stack:
+        source, target = stack.pop()
+        if _paths:
+            if target is None:
+                seen.remove(id(source))
+                continue
+            if id(source) in seen:
+                raise ValueError('circular reference')
+            seen.add(id(source))
+            stack.append((source, None))
+        if isinstance(target, list):
+            target.extend(source)
+            pairs = enumerate(source)
+        else:
+            pairs = source.items()
+        nested = False
+        for key, value in pairs:
+            if isinstance(value, mappings):
+                child = new_mapping()
+            elif isinstance(value, (list, tuple)):
+                child = []
+                if type(value) is not list:
+                    sequences.append((target, key, child, type(value)))
+            else:
+                target[key] = value
+                continue
+            target[key] = child
+            stack.append((value, child))
+            nested = True
+        if nested and not _paths:
+            if id(source) in seen:
+                return _convert(item, new_mapping, mappings, True)
+            seen.add(id(source))
+    for container, key, items, kind in reversed(sequences):
+        container[key] = kind(items)
+    if isinstance(root, list) and type(item) is not list:
+        return type(item)(root)
+    return root
+
+
+class CompactDict(dict):
+    # Dict without an instance __dict__ or weakref slot, for holding many
+    # small records. The bookkeeping lives in slots and every method is
+    # borrowed from Dict below.
+    __slots__ = ('_Dict__parent', '_Dict__frozen')
+
+    def __new__(cls, *args, **kwargs):
+        self = dict.__new__(cls)
+        object.__setattr__(self, '_Dict__parent', None)
+        object.__setattr__(self, '_Dict__frozen', False)
+        return self
+
+
+for _name, _value in list(vars(Dict).items()):
+    if _name not in vars(CompactDict) and _name not in (
+            '__dict__', '__weakref__', '__doc__', 'lazy', 'lazy_copy'):
+        setattr(CompactDict, _name, _value)
+del _name, _value
+
+
+class ReadDict(Dict):
+    # Read-optimised Dict: attribute reads that are not class attributes go
+    # straight to item lookup, and missing keys resolve to a _Missing
+    # placeholder, which only builds the child Dict once it is written to.
+
+    def __getattribute__(self, name):
+        try:
+            names = _class_names[type(self)]
+        except KeyError:
+            names = _class_names[type(self)] = frozenset(dir(type(self)))
+        if name in names:
+            return object.__getattribute__(self, name)
+        return self[name]
+
+    def __missing__(self, name):
+        if object.__getattribute__(self, '_Dict__frozen'):
+            raise KeyError(name)
+        return _missing(self, name)
+
+
+class _Empty(dict):
+    # A shared, empty and read-only mapping for missing keys of read-only
+    # views such as SnapshotDict. Dunder and private names are not keys, so
+    # protocols probed with getattr (copy, pickle, ...) see them missing.
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        return self
+
+    def __getattribute__(self, name):
+        if name in _class_names[type(self)]:
+            return object.__getattribute__(self, name)
+        if name[:1] == '_':
+            raise AttributeError(name)
+        return self[name]
+
+    def get(self, key, default=None):
+        return default
+
+    def __setitem__(self, name, value):
+        raise TypeError("cannot set '{0}' on a missing key of a read-only "
+                        "mapping".format(name))
+
+    __setattr__ = __setitem__
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("missing keys of a read-only mapping are read-only")
+
+    update = setdefault = __ior__ = _read_only
+
+    def __add__(self, other):
+        return other
+
+    def to_dict(self):
+        return {}
+
+    def copy(self):
+        return {}
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class _Missing(_Empty):
+    # What a missing key of a ReadDict reads as: empty like _Empty, but it
+    # remembers where it was read from, and the first write builds the
+    # child (and any missing parents) and assigns it to the parent key.
+    __slots__ = ('_Missing__at',)
+
+    def __getitem__(self, name):
+        return _missing(self, name)
+
+    def __vivify(self):
+        parent, key = object.__getattribute__(self, '_Missing__at')
+        if isinstance(parent, _Missing):
+            parent = parent.__vivify()
+        if key in parent:
+            # written through another placeholder since this one was read
+            return dict.__getitem__(parent, key)
+        child = parent[key] = parent.__class__()
+        return child
+
+    def __setitem__(self, name, value):
+        self.__vivify()[name] = value
+
+    def __setattr__(self, name, value):
+        setattr(self.__vivify(), name, value)
+
+    def update(self, *args, **kwargs):
+        self.__vivify().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        return self.__vivify().setdefault(key, default)
+
+    def __ior__(self, other):
+        child = self.__vivify()
+        child |= other
+        return child
+
+    def __class(self):
+        parent = self
+        while isinstance(parent, _Missing):
+            parent = object.__getattribute__(parent, '_Missing__at')[0]
+        return parent.__class__
+
+    def copy(self):
+        return self.__class()()
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce_ex__(self, protocol):
+        return self.__class(), ()
+
+
+def _missing(parent, key, _new=dict.__new__,
+             _set=_Missing._Missing__at.__set__):
+    # builds a placeholder without a Python-level __init__
+    placeholder = _new(_Missing)
+    _set(placeholder, (parent, key))
+    return placeholder
+
+
+_EMPTY = _Empty()
+_class_names = {_Empty: frozenset(dir(_Empty)),
+                _Missing: frozenset(dir(_Missing))}
+
+
+class _LazyDict(Dict):
+    # Keeps the payload's own containers and converts a value with _hook
+    # the first time it is read; converted keys are remembered in __wrapped.
+
+    def __init__(__self, *args, **kwargs):
+        Dict.__init__(__self, __parent=kwargs.pop('__parent', None),
+                      __key=kwargs.pop('__key', None))
+        object.__setattr__(__self, '__wrapped', set())
+        for arg in args:
+            if not arg:
+                continue
+            elif isinstance(arg, _LazyDict):
+                dict.update(__self, dict.items(arg))
+            elif isinstance(arg, dict):
+                dict.update(__self, arg)
+            elif isinstance(arg, tuple) and (not isinstance(arg[0], tuple)):
+                dict.__setitem__(__self, arg[0], arg[1])
+            else:
+                for key, val in iter(arg):
+                    dict.__setitem__(__self, key, val)
+        dict.update(__self, kwargs)
+
+    def __getitem__(self, name):
+        value = dict.__getitem__(self, name)
+        wrapped = object.__getattribute__(self, '__wrapped')
+        if name in wrapped or not dict.__contains__(self, name):
+            return value
+        value = self._hook(value)
+        dict.__setitem__(self, name, value)
+        wrapped.add(name)
+        return value
+
+    def __setitem__(self, name, value):
+        super(_LazyDict, self).__setitem__(name, value)
+        object.__getattribute__(self, '__wrapped').add(name)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, name, *default):
+        if not dict.__contains__(self, name):
+            return dict.pop(self, name, *default)
+        value = self[name]
+        dict.__delitem__(self, name)
+        object.__getattribute__(self, '__wrapped').discard(name)
+        return value
+
+    def popitem(self):
+        name, value = dict.popitem(self)
+        wrapped = object.__getattribute__(self, '__wrapped')
+        if name in wrapped:
+            wrapped.discard(name)
+            return name, value
+        return name, self._hook(value)
+
+    def __iter__(self):
+        # Defined so that dict(lazy) and dict.update(other, lazy) read the
+        # values through __getitem__ instead of copying raw payload values
+        return dict.__iter__(self)
+
+    @classmethod
+    def _hook(cls, item):
+        if isinstance(item, dict):
+            return cls(item)
+        elif isinstance(item, (list, tuple)):
+            return type(item)(cls._hook(elem) for elem in item)
+        return item
+
+    def _wrap_all(self):
+        for key in list(dict.keys(self)):
+            self[key]
+
+    def items(self):
+        self._wrap_all()
+        return super(_LazyDict, self).items()
+
+    def values(self):
+        self._wrap_all()
+        return super(_LazyDict, self).values()
+
+    def __copy__(self):
+        return _restore_lazy(self._eager_class, dict(self.items()))
+
+    def __reduce_ex__(self, protocol):
+        state = dict(self.items())
+        if protocol >= 5:
+            _out_of_band(state)
+        return (_restore_lazy,
+                (self._eager_class, state, self._Dict__frozen))
+
+
+_lazy_classes = {}
+
+
+def _lazy_class(cls):
+    if issubclass(cls, _LazyDict):
+        return cls
+    try:
+        return _lazy_classes[cls]
+    except KeyError:
+        lazy_cls = type('Lazy' + cls.__name__, (_LazyDict, cls),
+                        {'_eager_class': cls, '__module__': cls.__module__})
+        _lazy_classes[cls] = lazy_cls
+        return lazy_cls
+
+
+def _restore_lazy(cls, items, frozen=False):
+    restored = cls.lazy()
+    for key, value in items.items():
+        restored[key] = value
+    if frozen:
+        object.__setattr__(restored, '_Dict__frozen', True)
+    return restored
+
+
+class _InternedKeys(object):
+    # Mixin that interns str keys as they are stored, through __init__,
+    # _hook, update, item and attribute writes and the JSON builders. Records
+    # that are parsed one by one then share a single copy of each key
+    # instead of carrying their own. CPython only shares whole key tables
+    # between instance __dict__s, never between dicts, so the key objects
+    # are what can be shared. On Python 2, intern() only takes str, so the
+    # unicode keys that json returns are shared through a table that is
+    # never emptied. The mixin has no slots, so CompactDict can take it too.
+    __slots__ = ()
+
+    def __setitem__(self, name, value):
+        if type(name) in _INTERNABLE:
+            name = _intern(name)
+        super(_InternedKeys, self).__setitem__(name, value)
+
+    @classmethod
+    def _from_pairs(cls, pairs):
+        new = cls()
+        dict.update(new, _intern_keys(pairs))
+        return new
+
+    def __reduce_ex__(self, protocol):
+        return (_restore_interned,
+                _reduce(self, self._uninterned_class, protocol)[1])
+
+
+_interned_classes = {}
+
+
+def _interned_class(cls):
+    if issubclass(cls, _InternedKeys):
+        return cls
+    try:
+        return _interned_classes[cls]
+    except KeyError:
+        interned_cls = type('Interned' + cls.__name__, (_InternedKeys, cls),
+                            {'_uninterned_class': cls, '__slots__': (),
+                             '__module__': cls.__module__})
+        _interned_classes[cls] = interned_cls
+        return interned_cls
+
+
+def _intern_keys(pairs):
+    return [(_intern(key) if type(key) in _INTERNABLE else key, value)
+            for key, value in pairs]
+
+
+def _restore_interned(cls, state, frozen):
+    return _restore(_interned_class(cls), _intern_keys(state.items()), frozen)
+
+
+class _Probing(object):
+    # Mixin for probing_class(). Code that probes objects with hasattr() or
+    # getattr(obj, name, default), such as serializers looking for __html__
+    # or _asdict, gets a new detached child from a Dict for every missing
+    # name, and hasattr() is always true. Here a missing attribute whose
+    # name matches raises AttributeError, so the probe sees it as absent
+    # and nothing is allocated. Items, and attributes with other names,
+    # still auto-vivify. Each kind of names has its own __getattr__ below,
+    # which the class takes directly.
+    __slots__ = ()
+
+    def __reduce_ex__(self, protocol):
+        return (_restore_probing,
+                _reduce(self, self._unprobed_class, protocol)[1] +
+                (self._probe_names,))
+
+
+def _getattr_dunder(self, item):
+    if item[:2] == '__' == item[-2:] and item not in self:
+        raise AttributeError(item)
+    return self[item]
+
+
+def _getattr_private(self, item):
+    if item[:1] == '_' and item not in self:
+        raise AttributeError(item)
+    return self[item]
+
+
+def _getattr_all(self, item):
+    if item not in self:
+        raise AttributeError(item)
+    return self[item]
+
+
+_PROBES = {
+    'dunder': _getattr_dunder,
+    'private': _getattr_private,
+    'all': _getattr_all,
+}
+_probing_classes = {}
+
+
+def _probing_class(cls, names):
+    if names not in _PROBES:
+        raise ValueError("names must be one of {0}, not '{1}'".format(
+            ', '.join(sorted(_PROBES)), names))
+    if issubclass(cls, _Probing):
+        cls = cls._unprobed_class
+    try:
+        return _probing_classes[cls, names]
+    except KeyError:
+        probing_cls = type('Probing' + cls.__name__, (_Probing, cls),
+                           {'_unprobed_class': cls, '_probe_names': names,
+                            '__getattr__': _PROBES[names],
+                            '__slots__': (), '__module__': cls.__module__})
+        _probing_classes[cls, names] = probing_cls
+        return probing_cls
+
+
+def _restore_probing(cls, state, frozen, names):
+    return _restore(_probing_class(cls, names), state, frozen)
+
+
+class _TrackedDict(object):
+    # Records which keys are written below a tracked Dict. Every Dict and
+    # CompactDict in the tree is switched to a tracked class, which puts
+    # this mixin in front of its own, and knows its path from the root.
+    # All nodes share the root's log, which maps each path written since the
+    # last checkpoint to whether the key existed before. Dicts that are not
+    # tracked keep their own class and pay nothing for this. Lists are plain
+    # values: writes inside them are not seen.
+    __slots__ = ()
+    __path = ()
+    __log = None
+
+    def __setitem__(self, name, value):
+        log = self.__log
+        if log is None:
+            return super(_TrackedDict, self).__setitem__(name, value)
+        old = dict.get(self, name, _MISSING)
+        if value is not old and isinstance(value, (Dict, CompactDict)):
+            _check_untracked(value, log)
+        super(_TrackedDict, self).__setitem__(name, value)
+        path = self.__path + (name,)
+        if path not in log:
+            log[path] = old is not _MISSING
+        if value is not old:
+            if isinstance(old, _TrackedDict):
+                _adopt(old, None, None)
+            if isinstance(value, (Dict, CompactDict)):
+                _adopt(value, path, log)
+
+    def __delitem__(self, name):
+        old = dict.get(self, name, _MISSING)
+        super(_TrackedDict, self).__delitem__(name)
+        if self.__log is not None:
+            self.__record(self.__log, name, old)
+
+    def pop(self, name, *default):
+        old = dict.get(self, name, _MISSING)
+        value = dict.pop(self, name, *default)
+        if self.__log is not None and old is not _MISSING:
+            self.__record(self.__log, name, old)
+        return value
+
+    def popitem(self):
+        name, value = dict.popitem(self)
+        if self.__log is not None:
+            self.__record(self.__log, name, value)
+        return name, value
+
+    def clear(self):
+        items = list(dict.items(self))
+        dict.clear(self)
+        if self.__log is not None:
+            for name, old in items:
+                self.__record(self.__log, name, old)
+
+    def __record(self, log, name, old):
+        # for removals; a subtree that left the tree must not record stale
+        # paths any more
+        path = self.__path + (name,)
+        if path not in log:
+            log[path] = old is not _MISSING
+        if isinstance(old, _TrackedDict):
+            _adopt(old, None, None)
+
+    def __copy__(self):
+        new = self._untracked_class.__new__(self._untracked_class)
+        dict.update(new, self)
+        return new
+
+    def __deepcopy__(self, memo):
+        other = self._untracked_class()
+        memo[id(self)] = other
+        for key, value in self.items():
+            other[copy.deepcopy(key, memo)] = copy.deepcopy(value, memo)
+        return other
+
+    def __reduce_ex__(self, protocol):
+        return _reduce(self, self._untracked_class, protocol)
+
+
+_compact_tracking = {}
+_UNTRACKED = ((), None)
+
+
+def _compact_state(index):
+    # The path (0) or the log (1) of a tracked CompactDict
+    def get(self):
+        return _compact_tracking.get(id(self), _UNTRACKED)[index]
+
+    def set(self, value):
+        state = list(_compact_tracking.get(id(self), _UNTRACKED))
+        state[index] = value
+        _compact_tracking[id(self)] = tuple(state)
+    return property(get, set)
+
+
+class _TrackedCompactDict(_TrackedDict):
+    # CompactDict has no room for the path and the log, so its tracked
+    # classes keep them in _compact_tracking, by id, until the node is
+    # untracked or collected
+    __slots__ = ()
+    _TrackedDict__path = _compact_state(0)
+    _TrackedDict__log = _compact_state(1)
+
+    def __del__(self):
+        _compact_tracking.pop(id(self), None)
+
+
+_tracked_classes = {}
+
+
+def _tracked_class(cls):
+    if issubclass(cls, _TrackedDict):
+        return cls
+    try:
+        return _tracked_classes[cls]
+    except KeyError:
+        mixin = (_TrackedCompactDict if issubclass(cls, CompactDict)
+                 else _TrackedDict)
+        tracked_cls = type('Tracked' + cls.__name__, (mixin, cls),
+                           {'_untracked_class': cls, '__slots__': (),
+                            '__module__': cls.__module__})
+        _tracked_classes[cls] = tracked_cls
+        return tracked_cls
+
+
+def _check_untracked(root, log=None):
+    # A node has one log; tracking it again, or a Dict shared with another
+    # tracked tree, would silently take it from whoever set it up, such as
+    # another Collection, and untracking one tree would strip the other.
+    # Nodes already on log are fine.
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _TrackedDict):
+            node_log = node._TrackedDict__log
+            if node_log is not None and node_log is not log:
+                raise ValueError(
+                    'the Dict, or a Dict in it, is already tracked, by '
+                    'track() or a Collection; untrack() or remove() it '
+                    'first')
+        stack.extend(value for value in dict.values(node)
+                     if isinstance(value, (Dict, CompactDict)))
+
+
+def _adopt(root, path, log):
+    # Points root and the Dicts below it at log, with their paths from the
+    # tracked root; a log of None stops recording
+    stack = [(root, path)]
+    while stack:
+        node, path = stack.pop()
+        if not isinstance(node, _TrackedDict):
+            if log is None:
+                continue
+            object.__setattr__(node, '__class__', _tracked_class(type(node)))
+        object.__setattr__(node, '_TrackedDict__path', path)
+        object.__setattr__(node, '_TrackedDict__log', log)
+        for key, value in dict.items(node):
+            if isinstance(value, (Dict, CompactDict)):
+                stack.append((value, None if log is None else path + (key,)))
+
+
+def _untrack(root):
+    # Switches root and the Dicts below it back to their own classes
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _TrackedCompactDict):
+            _compact_tracking.pop(id(node), None)
+        elif isinstance(node, _TrackedDict):
+            vars(node).pop('_TrackedDict__path', None)
+            vars(node).pop('_TrackedDict__log', None)
+        if isinstance(node, _TrackedDict):
+            object.__setattr__(node, '__class__', node._untracked_class)
+        stack.extend(value for value in dict.values(node)
+                     if isinstance(value, (Dict, CompactDict)))
@@ -0,0 +1,154 @@
+from collections import Counter
+from operator import itemgetter
+
+from .addict import Dict, _MISSING, _find, _parse_path
+
+
+class Aggregator(object):
+    # Counts rows, and optionally aggregates a value, per group. Groups are
+    # flat key tuples internally; the nested Dict form is only built when
+    # asked for. Aggregators are picklable and can be merged, so partial
+    # results can come from separate worker processes.
+
+    STATS = ('count', 'sum', 'min', 'max', 'mean')
+
+    def __init__(self, keys=None, value=None):
+        self.keys = tuple(keys) if keys is not None else None
+        self.value = value
+        self.counts = Counter()
+        # group -> [number of values, sum, min, max]
+        self.values = {}
+
+    def add(self, group, value=None):
+        group = tuple(group)
+        self.counts[group] += 1
+        if value is not None:
+            self._add_value(group, value)
+
+    def add_many(self, rows, keys=None, value=None):
+        # rows are records grouped by the `keys` paths, or group tuples
+        # themselves when there are no keys; `value` is the path of the
+        # number to aggregate
+        keys = self.keys if keys is None else tuple(keys)
+        value = self.value if value is None else value
+        if keys is None:
+            if value is not None:
+                raise ValueError('aggregating a value needs keys')
+            self.counts.update(tuple(row) for row in rows)
+            return self
+        get_group = _group_getter(keys)
+        if value is None:
+            self.counts.update(map(get_group, rows))
+            return self
+        get_value = _getter(value)
+        counts = self.counts
+        add_value = self._add_value
+        for row in rows:
+            group = get_group(row)
+            counts[group] += 1
+            number = get_value(row)
+            if number is not None:
+                add_value(group, number)
+        return self
+
+    def _add_value(self, group, number):
+        stats = self.values.get(group)
+        if stats is None:
+            self.values[group] = [1, number, number, number]
+        else:
+            stats[0] += 1
+            stats[1] += number
+            if number < stats[2]:
+                stats[2] = number
+            if number > stats[3]:
+                stats[3] = number
+
+    def merge(self, *others):
+        for other in others:
+            self.counts.update(other.counts)
+            for group, (count, total, low, high) in other.values.items():
+                stats = self.values.get(group)
+                if stats is None:
+                    self.values[group] = [count, total, low, high]
+                else:
+                    stats[0] += count
+                    stats[1] += total
+                    stats[2] = min(stats[2], low)
+                    stats[3] = max(stats[3], high)
+        return self
+
+    def get(self, group, stat='count', default=None):
+        group = tuple(group)
+        if stat == 'count':
+            return self.counts.get(group, default)
+        stats = self.values.get(group)
+        return default if stats is None else _stat(stats, stat)
+
+    def items(self, stat='count'):
+        if stat not in self.STATS:
+            raise ValueError("unknown stat '{0}'".format(stat))
+        if stat == 'count':
+            return list(self.counts.items())
+        return [(group, _stat(stats, stat))
+                for group, stats in self.values.items()]
+
+    def to_dict(self, stat='count', dict_class=Dict):
+        nested = dict_class()
+        nested.set_many(self.items(stat))
+        return nested
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __repr__(self):
+        return '{0}(keys={1!r}, value={2!r}, groups={3})'.format(
+            type(self).__name__, self.keys, self.value, len(self))
+
+
+def _stat(stats, stat):
+    count, total, low, high = stats
+    if stat == 'sum':
+        return total
+    elif stat == 'min':
+        return low
+    elif stat == 'max':
+        return high
+    elif stat == 'mean':
+        return float(total) / count
+    raise ValueError("unknown stat '{0}'".format(stat))
+
+
+def _getter(path):
+    keys = _parse_path(path)
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda row: row.get(key)
+
+    def get(row):
+        value = _find(row, keys)
+        return None if value is _MISSING else value
+    return get
+
+
+def _group_getter(paths):
+    keys = [_parse_path(path) for path in paths]
+    if any(len(key) != 1 for key in keys):
+        getters = [_getter(path) for path in paths]
+        return lambda row: tuple([get(row) for get in getters])
+    names = [key[0] for key in keys]
+    if len(names) == 1:
+        name = names[0]
+        fast = lambda row: (row[name],)
+    else:
+        fast = itemgetter(*names)
+
+    # plain dicts take the C-level itemgetter; anything else (including
+    # Dicts, whose missing keys would vivify) falls back to .get
+    def get(row):
+        if type(row) is dict:
+            try:
+                return fast(row)
+            except KeyError:
+                pass
+        return tuple([row.get(name) for name in names])
+    return get
@@ -0,0 +1,61 @@
+import asyncio
+import json
+from functools import partial
+
+from .addict import Dict
+
+
+# Readers are asyncio StreamReaders, or anything else with a coroutine
+# read(n) that returns bytes or str and an empty value at the end. The
+# stdlib decoder cannot resume in the middle of a document, so input is
+# read chunk by chunk, giving the loop a turn after each one, and every
+# document is decoded in one go: in the loop, or in an executor once it is
+# offload_size characters or more.
+
+
+async def afrom_stream(reader, dict_class=Dict, chunk_size=1 << 16,
+                       offload_size=None, executor=None, **kwargs):
+    # Dict.from_json for a stream; executor=None offloads to the loop's
+    # default executor
+    kwargs['object_pairs_hook'] = dict_class._from_pairs
+    chunks = []
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        await asyncio.sleep(0)
+    source = chunks[0][:0].join(chunks) if chunks else ''
+    return await _loads(source, offload_size, executor, kwargs)
+
+
+async def aiter_ndjson(reader, dict_class=Dict, chunk_size=1 << 16,
+                       offload_size=None, executor=None, **kwargs):
+    # iter_json_lines for a stream: one document per line, blank lines
+    # skipped
+    kwargs['object_pairs_hook'] = dict_class._from_pairs
+    pending = []
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        lines = chunk.split(b'\n' if isinstance(chunk, bytes) else '\n')
+        if len(lines) > 1:
+            lines[0] = chunk[:0].join(pending) + lines[0]
+            pending = []
+        pending.append(lines.pop())
+        for line in lines:
+            if line.strip():
+                yield await _loads(line, offload_size, executor, kwargs)
+        await asyncio.sleep(0)
+    if pending:
+        line = pending[0][:0].join(pending)
+        if line.strip():
+            yield await _loads(line, offload_size, executor, kwargs)
+
+
+async def _loads(source, offload_size, executor, kwargs):
+    if offload_size is None or len(source) < offload_size:
+        return json.loads(source, **kwargs)
+    return await asyncio.get_event_loop().run_in_executor(
+        executor, partial(json.loads, source, **kwargs))
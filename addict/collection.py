@@ -0,0 +1,250 @@
+import sys
+from bisect import bisect_left, bisect_right, insort
+
+from .addict import (CompactDict, Dict, _MISSING, _adopt, _check_untracked,
+                     _find, _parse_path, _untrack)
+
+
+class Collection(object):
+    # Dict records with indexes on paths: 'hash' indexes answer find() and
+    # 'sorted' indexes answer range() without looking at other records.
+    # Records are tracked (see addict.track) with a log that marks a record
+    # dirty when it is written to, through attributes, items or update();
+    # every query first reindexes the records that are dirty. Writes inside
+    # lists are not seen, so indexed paths should only go through mappings.
+    #
+    # Records are numbered in the order they are added, and the indexes hold
+    # those numbers.
+
+    KINDS = ('hash', 'sorted')
+
+    def __init__(self, records=(), indexes=(), sorted_indexes=(),
+                 dict_class=Dict):
+        self.dict_class = dict_class
+        self._records = {}
+        self._numbers = {}
+        self._count = 0
+        self._dirty = {}
+        self._indexes = {}
+        for path in indexes:
+            self.add_index(path)
+        for path in sorted_indexes:
+            self.add_index(path, 'sorted')
+        self.extend(records)
+
+    def add_index(self, path, kind='hash'):
+        if kind not in self.KINDS:
+            raise ValueError("unknown index kind '{0}'".format(kind))
+        keys = _parse_path(path)
+        index = (_HashIndex if kind == 'hash' else _SortedIndex)(path)
+        self._refresh()
+        for number, record in self._records.items():
+            index.add(number, _find(record, keys))
+        self._indexes[keys, kind] = index
+
+    def drop_index(self, path, kind='hash'):
+        del self._indexes[_parse_path(path), kind]
+
+    def add(self, record):
+        # Plain mappings are converted to dict_class; the record that is
+        # stored is returned. A Dict that is tracked, or holds a Dict that
+        # is, by track() or as (part of) a record of another Collection, is
+        # refused, as the Collection needs its log to see the writes. A
+        # record whose values the indexes refuse is not added.
+        if not isinstance(record, (Dict, CompactDict)):
+            record = self.dict_class(record)
+        if id(record) not in self._numbers:
+            _check_untracked(record)
+            number = self._count
+            self._index(number, record)
+            self._count += 1
+            self._numbers[id(record)] = number
+            self._records[number] = record
+            _adopt(record, (), _Log(self._dirty, number))
+        return record
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def remove(self, record):
+        if record not in self:
+            raise ValueError('record is not in the collection')
+        number = self._numbers.pop(id(record))
+        self._unindex(number)
+        self._dirty.pop(number, None)
+        del self._records[number]
+        _untrack(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(list(self._records.values()))
+
+    def __contains__(self, record):
+        number = self._numbers.get(id(record))
+        return number is not None and self._records[number] is record
+
+    def find(self, conditions=None, **fields):
+        # Records whose value at each path equals the given value, in the
+        # order they were added. conditions maps paths to values; keyword
+        # arguments are top-level keys. The smallest match of a hash index
+        # is checked against the other conditions.
+        self._refresh()
+        conditions = [(_parse_path(path), value) for path, value in
+                      dict(conditions or {}, **fields).items()]
+        best = None
+        for position, (keys, value) in enumerate(conditions):
+            index = self._indexes.get((keys, 'hash'))
+            if index is not None:
+                matches = index.find(value)
+                if best is None or len(matches) < len(best[1]):
+                    best = position, matches
+        if best is None:
+            records = self._records.values()
+        else:
+            del conditions[best[0]]
+            records = [self._records[number] for number in sorted(best[1])]
+        return [record for record in records
+                if all(_find(record, keys) == value
+                       for keys, value in conditions)]
+
+    def range(self, path, low=None, high=None):
+        # Records with low <= value at path <= high, ordered by that value;
+        # None leaves a bound open. Values must be comparable with each
+        # other; records with None or no value at path are left out.
+        self._refresh()
+        keys = _parse_path(path)
+        index = self._indexes.get((keys, 'sorted'))
+        if index is None:
+            index = _SortedIndex(path)
+            for number, record in self._records.items():
+                index.add(number, _find(record, keys))
+        return [self._records[number] for number in index.range(low, high)]
+
+    def index_memory(self):
+        # Bytes held by each index, keyed by (path, kind), on top of the
+        # records and the indexed values themselves
+        self._refresh()
+        return dict(((index.path, kind), index.memory())
+                    for (_, kind), index in self._indexes.items())
+
+    def _index(self, number, record):
+        # all or nothing: a value that a sorted index cannot compare with
+        # the others takes the record out of the indexes again
+        try:
+            for (keys, _), index in self._indexes.items():
+                index.add(number, _find(record, keys))
+        except Exception:
+            self._unindex(number)
+            raise
+
+    def _unindex(self, number):
+        for index in self._indexes.values():
+            index.remove(number)
+
+    def _refresh(self):
+        dirty = self._dirty
+        while dirty:
+            number, log = dirty.popitem()
+            log.clear()
+            self._unindex(number)
+            try:
+                self._index(number, self._records[number])
+            except Exception:
+                # stays dirty, so queries raise until the value is fixed
+                dirty[number] = log
+                raise
+
+
+class _Log(dict):
+    # The change log of a record in a Collection. _TrackedDict only adds a
+    # path the first time it is written after the log was cleared, so each
+    # record is marked dirty once between two queries.
+    __slots__ = ('dirty', 'number')
+
+    def __init__(self, dirty, number):
+        self.dirty = dirty
+        self.number = number
+
+    def __setitem__(self, path, existed):
+        dict.__setitem__(self, path, existed)
+        self.dirty[self.number] = self
+
+
+class _HashIndex(object):
+    # value -> {number: None}, plus number -> value to find the entry
+    # again. Unhashable values are kept aside and always checked.
+
+    def __init__(self, path):
+        self.path = path
+        self.values = {}
+        self.table = {}
+        self.unhashable = {}
+
+    def add(self, number, value):
+        if value is _MISSING:
+            return
+        try:
+            self.table.setdefault(value, {})[number] = None
+        except TypeError:
+            self.unhashable[number] = None
+        self.values[number] = value
+
+    def remove(self, number):
+        value = self.values.pop(number, _MISSING)
+        if value is _MISSING:
+            return
+        if number in self.unhashable:
+            del self.unhashable[number]
+            return
+        bucket = self.table[value]
+        del bucket[number]
+        if not bucket:
+            del self.table[value]
+
+    def find(self, value):
+        try:
+            matches = self.table.get(value, ())
+        except TypeError:
+            matches = ()
+        if self.unhashable:
+            return list(matches) + list(self.unhashable)
+        return matches
+
+    def memory(self):
+        return (sys.getsizeof(self.values) + sys.getsizeof(self.table) +
+                sys.getsizeof(self.unhashable) +
+                sum(sys.getsizeof(bucket) for bucket in self.table.values()))
+
+
+class _SortedIndex(object):
+    # sorted (value, number) pairs, plus number -> value to find the entry
+    # again
+
+    def __init__(self, path):
+        self.path = path
+        self.values = {}
+        self.entries = []
+
+    def add(self, number, value):
+        if value is not _MISSING and value is not None:
+            insort(self.entries, (value, number))
+            self.values[number] = value
+
+    def remove(self, number):
+        value = self.values.pop(number, _MISSING)
+        if value is not _MISSING:
+            del self.entries[bisect_left(self.entries, (value, number))]
+
+    def range(self, low, high):
+        entries = self.entries
+        start = 0 if low is None else bisect_left(entries, (low,))
+        end = (len(entries) if high is None else
+               bisect_right(entries, (high, float('inf'))))
+        return [number for _, number in entries[start:end]]
+
+    def memory(self):
+        return (sys.getsizeof(self.values) + sys.getsizeof(self.entries) +
+                sum(sys.getsizeof(entry) for entry in self.entries))
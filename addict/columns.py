@@ -0,0 +1,98 @@
+from array import array
+
+from .addict import Dict, _MISSING, _find, _parse_path
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# typecodes to try in turn; Python 2 has no 'q', so ints fall back to 'l'
+_ARRAY_TYPECODES = {'int': ('q', 'l'), 'float': ('d',)}
+
+
+def to_columns(records, paths, fill=None, backend='auto'):
+    # Pulls the values at `paths` out of every record in one pass over the
+    # records. Missing values become `fill`; nothing is auto-vivified. Each
+    # column is a numpy array, an array.array or a list depending on
+    # `backend` and the types found ('auto' prefers numpy when installed).
+    if backend == 'auto':
+        backend = 'numpy' if numpy is not None else 'array'
+    if backend not in ('numpy', 'array', 'list'):
+        raise ValueError("unknown backend '{0}'".format(backend))
+    paths = list(paths)
+    columns = [[] for _ in paths]
+    groups = {}
+    for column, path in zip(columns, paths):
+        keys = _parse_path(path)
+        groups.setdefault(keys[:-1], []).append((keys[-1:], column.append))
+    groups = list(groups.items())
+    for record in records:
+        for prefix, leaves in groups:
+            parent = _find(record, prefix)
+            for leaf, append in leaves:
+                value = _MISSING if parent is _MISSING else _find(parent, leaf)
+                append(fill if value is _MISSING else value)
+    return dict((path, _build_column(column, backend))
+                for path, column in zip(paths, columns))
+
+
+def from_columns(columns, dict_class=Dict, fill=_MISSING):
+    # The reverse of to_columns: one dict_class record per row, with values
+    # that are `fill` left out.
+    paths = list(columns)
+    rows = zip(*[_as_list(columns[path]) for path in paths])
+    records = []
+    for row in rows:
+        record = dict_class()
+        record.set_many((path, value) for path, value in zip(paths, row)
+                        if fill is _MISSING or not _is_fill(value, fill))
+        records.append(record)
+    return records
+
+
+def _infer(values):
+    kinds = set(type(value) for value in values)
+    if kinds == set([bool]):
+        return 'bool'
+    elif kinds and kinds <= set([int]):
+        return 'int'
+    elif kinds and kinds <= set([int, float]):
+        return 'float'
+    return None
+
+
+def _build_column(values, backend):
+    if backend == 'list':
+        return values
+    kind = _infer(values)
+    if backend == 'numpy':
+        dtype = {'bool': numpy.bool_, 'int': numpy.int64,
+                 'float': numpy.float64}.get(kind, object)
+        if dtype is not object:
+            try:
+                return numpy.array(values, dtype=dtype)
+            except OverflowError:
+                # ints that do not fit in 64 bits are kept as objects
+                pass
+        column = numpy.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    for typecode in _ARRAY_TYPECODES.get(kind, ()):
+        try:
+            return array(typecode, values)
+        except (OverflowError, ValueError):
+            pass
+    return values
+
+
+def _as_list(column):
+    return column.tolist() if hasattr(column, 'tolist') else list(column)
+
+
+def _is_fill(value, fill):
+    if value is fill or value == fill:
+        return True
+    # NaN is a common fill value and does not compare equal to itself
+    return value != value and fill != fill
@@ -0,0 +1,151 @@
+import threading
+
+from .addict import Dict, _MISSING, _parse_path
+
+
+_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def _lock(node):
+    # read-modify-write operations lock one of _LOCKS, picked by node
+    return _LOCKS[(id(node) >> 4) % len(_LOCKS)]
+
+
+class ConcurrentDict(Dict):
+    # Dict for state shared between threads. Reads are plain dict reads and
+    # take no lock. An auto-vivified child is linked into its parent with
+    # dict.setdefault, so when two threads vivify the same key at once only
+    # one child gets in; the other one's writes are merged into it and the
+    # loser forwards to the winner from then on, so no write is lost.
+    # increment() and setdefault_path() are atomic; `d.a.b += 1` is not.
+
+    def __setitem__(self, name, value):
+        if self._Dict__frozen and name not in self:
+            raise KeyError(name)
+        dict.__setitem__(self, name, value)
+        if self._Dict__parent is not None:
+            _attach(self)
+
+    def setdefault(self, key, default=None):
+        return dict.setdefault(_attached(self), key, default)
+
+    def setdefault_path(self, path, default=None):
+        keys = _parse_path(path)
+        return dict.setdefault(_walk(self, keys[:-1]), keys[-1], default)
+
+    def increment(self, path, amount=1):
+        keys = _parse_path(path)
+        node = _walk(self, keys[:-1])
+        with _lock(node):
+            value = dict.get(node, keys[-1], 0) + amount
+            dict.__setitem__(node, keys[-1], value)
+        return value
+
+
+def _take_parent(node):
+    # The (parent, key) link of a detached node, taken off it, or None if
+    # another thread has already taken it. Handles to a detached node can
+    # be shared between threads, so the link is swapped under a lock.
+    with _lock(node):
+        link = node._Dict__parent
+        if link is not None:
+            object.__setattr__(node, '_Dict__parent', None)
+    return link
+
+
+def _attach(node):
+    # Links a detached node, and its detached ancestors, into the tree. A
+    # node whose link is gone is being attached by the thread that took it.
+    while True:
+        link = _take_parent(node)
+        if link is None:
+            return
+        parent, key = link
+        if issubclass(type(parent), _Forwarded):
+            parent = object.__getattribute__(parent, '_forward')
+        current = dict.setdefault(parent, key, node)
+        if current is not node:
+            if isinstance(current, ConcurrentDict):
+                _merge(current, node)
+            else:
+                parent[key] = node
+            return
+        if parent._Dict__parent is None:
+            return
+        node = parent
+
+
+def _attached(node):
+    # The node in the tree that takes the place of node
+    if node._Dict__parent is not None:
+        _attach(node)
+    if issubclass(type(node), _Forwarded):
+        return object.__getattribute__(node, '_forward')
+    return node
+
+
+def _walk(node, keys):
+    node = _attached(node)
+    for key in keys:
+        child = dict.get(node, key, _MISSING)
+        if child is _MISSING:
+            child = dict.setdefault(node, key, node.__class__())
+        elif not isinstance(child, dict):
+            raise TypeError("cannot set '{0}' on {1!r}".format(key, child))
+        node = child
+    return node
+
+
+def _merge(winner, loser):
+    # Moves the writes of a node that lost the race to attach into the one
+    # that won, then turns the loser into a forwarder
+    stack = [(winner, loser)]
+    while stack:
+        winner, loser = stack.pop()
+        for key, value in list(dict.items(loser)):
+            current = dict.setdefault(winner, key, value)
+            if current is value:
+                continue
+            if (isinstance(current, ConcurrentDict) and
+                    isinstance(value, ConcurrentDict)):
+                stack.append((current, value))
+            else:
+                dict.__setitem__(winner, key, value)
+        object.__setattr__(loser, '_forward', winner)
+        object.__setattr__(loser, '__class__', _forwarded_class(type(loser)))
+
+
+class _Forwarded(ConcurrentDict):
+    # A ConcurrentDict that lost the race to attach. Attribute lookups and
+    # the item protocol go to the node that won.
+
+    def __getattribute__(self, name):
+        return getattr(object.__getattribute__(self, '_forward'), name)
+
+
+def _forwarding(name):
+    def method(self, *args):
+        return getattr(object.__getattribute__(self, '_forward'), name)(*args)
+    method.__name__ = name
+    return method
+
+
+for _name in ('__getitem__', '__setitem__', '__delitem__', '__contains__',
+              '__iter__', '__len__', '__eq__', '__ne__', '__repr__'):
+    setattr(_Forwarded, _name, _forwarding(_name))
+del _name
+
+
+_forwarded_classes = {}
+
+
+def _forwarded_class(cls):
+    if issubclass(cls, _Forwarded):
+        return cls
+    try:
+        return _forwarded_classes[cls]
+    except KeyError:
+        forwarded_cls = type('Forwarded' + cls.__name__, (_Forwarded, cls),
+                             {'__module__': cls.__module__})
+        _forwarded_classes[cls] = forwarded_cls
+        return forwarded_cls
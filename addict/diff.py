@@ -0,0 +1,90 @@
+from .addict import (CompactDict, Dict, _MISSING, _TrackedDict, _adopt,
+                     _assign, _check_untracked, _convert, _find, _parse_path,
+                     _untrack)
+
+
+def track(tree):
+    # Starts recording which paths below the Dict tree are written to;
+    # checkpoint(tree) returns them as a patch. See _TrackedDict.
+    if not isinstance(tree, (Dict, CompactDict)):
+        raise TypeError('only Dicts can be tracked, not {0}'.format(
+            type(tree).__name__))
+    _check_untracked(tree)
+    _adopt(tree, (), {})
+    return tree
+
+
+def checkpoint(tree):
+    # The changes since track() or the last checkpoint as a list of
+    # {'op': 'add' | 'remove', 'path': keys[, 'value': plain copy]}
+    # operations, which apply_patch applies to another tree. A changed path
+    # covers everything below it.
+    if not isinstance(tree, _TrackedDict) or tree._TrackedDict__log is None:
+        raise ValueError('the Dict is not tracked')
+    if tree._TrackedDict__path:
+        raise ValueError('checkpoint() is called on the tracked root')
+    log = tree._TrackedDict__log
+    patch = []
+    for path, existed in log.items():
+        if any(path[:end] in log for end in range(1, len(path))):
+            continue
+        value = _find(tree, path)
+        if value is not _MISSING:
+            patch.append({'op': 'add', 'path': path,
+                          'value': _convert(value, dict, dict)})
+        elif existed:
+            patch.append({'op': 'remove', 'path': path})
+    log.clear()
+    return patch
+
+
+def untrack(tree):
+    # Stops recording; tree and the Dicts below it get their own classes
+    # back
+    _untrack(tree)
+    return tree
+
+
+def diff(old, new):
+    # The patch that turns `old` into `new`, in the format of checkpoint().
+    # Mappings are compared key by key; values that are the same object are
+    # skipped without looking inside them, so trees that share most of
+    # their subtrees are compared in the time it takes to walk the parts
+    # that differ. Anything else, lists included, is replaced as a whole
+    # when it is not equal.
+    patch = []
+    queue = [((), old, new)]
+    for path, before, after in queue:
+        for key in before:
+            if key not in after:
+                patch.append({'op': 'remove', 'path': path + (key,)})
+        for key, value in after.items():
+            previous = before.get(key, _MISSING)
+            if previous is value:
+                continue
+            if isinstance(previous, dict) and isinstance(value, dict):
+                queue.append((path + (key,), previous, value))
+            elif previous is _MISSING or previous != value:
+                patch.append({'op': 'add', 'path': path + (key,),
+                              'value': _convert(value, dict, dict)})
+    return patch
+
+
+def apply_patch(target, patch):
+    # Applies a patch from diff() or checkpoint() to target in place.
+    # Added values are copied into the type of the mapping they go into.
+    for operation in patch:
+        keys = _parse_path(operation['path'])
+        parent = _find(target, keys[:-1])
+        if parent is _MISSING:
+            raise KeyError(operation['path'])
+        if operation['op'] == 'add':
+            mapping = type(parent) if isinstance(parent, dict) else dict
+            _assign(parent, keys[-1],
+                    _convert(operation['value'], mapping, dict))
+        elif operation['op'] == 'remove':
+            del parent[keys[-1]]
+        else:
+            raise ValueError("unknown patch operation '{0}'".format(
+                operation['op']))
+    return target
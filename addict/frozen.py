@@ -0,0 +1,127 @@
+from .addict import Dict, _convert
+
+
+class FrozenDict(dict):
+    # Immutable snapshot of a Dict tree. Nested mappings become FrozenDicts,
+    # lists and tuples become tuples and sets become frozensets, so the whole
+    # tree is hashable; the hash is computed once and cached.
+    __slots__ = ('_hash',)
+
+    def __new__(cls, *args, **kwargs):
+        if (len(args) == 1 and not kwargs and type(args[0]) is cls):
+            return args[0]
+        return _freeze(dict(*args, **kwargs), cls)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("'{0}' object is immutable".format(
+            type(self).__name__))
+
+    __setattr__ = __delattr__ = __setitem__ = __delitem__ = _immutable
+    update = setdefault = pop = popitem = clear = __ior__ = _immutable
+
+    def __hash__(self):
+        value = self._hash
+        if value is None:
+            value = hash(frozenset(dict.items(self)))
+            object.__setattr__(self, '_hash', value)
+        return value
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if (isinstance(other, FrozenDict) and self._hash is not None and
+                other._hash is not None and self._hash != other._hash):
+            return False
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def copy(self):
+        return self
+
+    def to_dict(self):
+        return _convert(self, dict, FrozenDict)
+
+    def thaw(self, dict_class=Dict):
+        return dict_class(self)
+
+
+def _freeze(item, cls, _paths=False):
+    # Builds the snapshot on an explicit stack like _convert, including how
+    # cycles are found; tuples are created after their children, existing
+    # FrozenDicts are reused as is.
+    root = _frozen_node(cls)
+    stack = [(item, root)]
+    sequences = []
+    seen = set()
+    while stack:
+        source, target = stack.pop()
+        if _paths:
+            if target is None:
+                seen.remove(id(source))
+                continue
+            if id(source) in seen:
+                raise ValueError('circular reference')
+            seen.add(id(source))
+            stack.append((source, None))
+        if isinstance(target, list):
+            target.extend(source)
+            pairs = enumerate(source)
+        else:
+            pairs = source.items()
+        nested = False
+        for key, value in pairs:
+            if isinstance(value, FrozenDict):
+                child = value
+            elif isinstance(value, dict):
+                child = _frozen_node(cls)
+                stack.append((value, child))
+                nested = True
+            elif isinstance(value, (list, tuple)):
+                child = []
+                sequences.append((target, key, child))
+                stack.append((value, child))
+                nested = True
+            elif isinstance(value, (set, frozenset)):
+                child = frozenset(value)
+            else:
+                child = value
+            if isinstance(target, list):
+                target[key] = child
+            else:
+                dict.__setitem__(target, key, child)
+        if nested and not _paths:
+            if id(source) in seen:
+                return _freeze(item, cls, True)
+            seen.add(id(source))
+    for container, key, items in reversed(sequences):
+        if isinstance(container, list):
+            container[key] = tuple(items)
+        else:
+            dict.__setitem__(container, key, tuple(items))
+    return root
+
+
+def _frozen_node(cls):
+    node = dict.__new__(cls)
+    object.__setattr__(node, '_hash', None)
+    return node
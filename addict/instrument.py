@@ -0,0 +1,266 @@
+import copy
+import os
+import sys
+import threading
+from timeit import default_timer
+
+from .addict import CompactDict, Dict
+
+
+class Profiler(object):
+    # Counts and times what Dicts do, attributed to the first call site
+    # outside addict. While it runs, the methods of Dict and CompactDict are
+    # replaced by wrappers; stop() puts the originals back, so a Dict that
+    # is not being profiled runs exactly the code it always does.
+    # Subclasses that override a method are only seen where they call up.
+    #
+    # Events:
+    #   init         Dicts built by __init__, other than auto-vivified ones
+    #   hook:dict,   mappings and sequences built by _hook, counted in
+    #   hook:list    the result of each outermost call, as a whole tree is
+    #                converted in one call; the time goes to the kind of
+    #                the value passed
+    #   missing      children auto-vivified by __missing__; 'unattached'
+    #                counts those that were never written to
+    #   attach       vivified children written to, under the site that
+    #                created them; folded into 'missing' by stats()
+    #   update       update calls; 'depth' is the deepest level merged
+    #   to_dict
+    #   deepcopy     nodes copied by __deepcopy__
+    #
+    # Calls that happen inside a call of the same event, such as the inits
+    # of nested Dicts, are counted under the site of the outermost call,
+    # and only the outermost call is timed. callback(event, site, seconds,
+    # count) is called as events are recorded; count is more than 1 only
+    # for the containers of a _hook call.
+
+    _running = None
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._stats = {}
+        self._children = {}
+        self._local = threading.local()
+        self._originals = []
+
+    def start(self):
+        if Profiler._running is not None:
+            raise RuntimeError('another Profiler is running')
+        Profiler._running = self
+        # CompactDict borrows Dict's methods, and gets the same wrappers, so
+        # that it still counts as converting like Dict (see _plain)
+        wrappers = {}
+        for cls in (Dict, CompactDict):
+            for name, wrap in _WRAPPERS.items():
+                original = vars(cls)[name]
+                if id(original) not in wrappers:
+                    wrappers[id(original)] = wrap(self, original)
+                self._originals.append((cls, name, original))
+                setattr(cls, name, wrappers[id(original)])
+        return self
+
+    def stop(self):
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        del self._originals[:]
+        Profiler._running = None
+
+    __enter__ = start
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        self._stats.clear()
+        self._children.clear()
+
+    def stats(self):
+        # One row per event and call site, the most time first
+        attached = dict((site, stat[0]) for (event, site), stat
+                        in self._stats.items() if event == 'attach')
+        rows = []
+        for (event, site), (count, elapsed, depth) in self._stats.items():
+            if event == 'attach':
+                continue
+            row = {'event': event, 'site': site, 'count': count,
+                   'time': elapsed}
+            if event == 'missing':
+                row['unattached'] = count - attached.get(site, 0)
+            elif event == 'update':
+                row['depth'] = depth
+            rows.append(row)
+        rows.sort(key=lambda row: (-row['time'], -row['count']))
+        return rows
+
+    def _record(self, event, site, elapsed, depth=0, count=1):
+        stat = self._stats.get((event, site))
+        if stat is None:
+            stat = self._stats[event, site] = [0, 0.0, 0]
+        stat[0] += count
+        stat[1] += elapsed
+        if depth > stat[2]:
+            stat[2] = depth
+        if self.callback is not None:
+            self.callback(event, site, elapsed, count)
+
+    def _call(self, event, original, args, kwargs, depth=0):
+        # Runs original, timed and attributed when it is the outermost call
+        # of event on this thread
+        active = self._local.__dict__.setdefault('active', {})
+        site = active.get(event)
+        if site is not None:
+            self._record(event, site, 0.0, depth)
+            return original(*args, **kwargs)
+        site = active[event] = _site()
+        start = default_timer()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            del active[event]
+            self._record(event, site, default_timer() - start, depth)
+
+
+def _wrap_init(profiler, original):
+    def __init__(*args, **kwargs):
+        if '__parent' in kwargs:
+            return original(*args, **kwargs)
+        return profiler._call('init', original, args, kwargs)
+    return __init__
+
+
+def _wrap_hook(profiler, original):
+    # Dict._hook converts a whole tree at once, and subclasses that convert
+    # per node call _hook again from inside; only the outermost call is
+    # timed, and the containers in what it returns are counted
+    function = original.__func__
+
+    def _hook(cls, item):
+        if isinstance(item, dict):
+            event = 'hook:dict'
+        elif isinstance(item, (list, tuple)):
+            event = 'hook:list'
+        else:
+            return function(cls, item)
+        active = profiler._local.__dict__.setdefault('active', {})
+        if 'hook' in active:
+            return function(cls, item)
+        site = active['hook'] = _site()
+        start = default_timer()
+        try:
+            result = function(cls, item)
+        finally:
+            del active['hook']
+        elapsed = default_timer() - start
+        counts = _count_containers(result)
+        for kind in ('hook:dict', 'hook:list'):
+            if counts[kind] or kind == event:
+                profiler._record(kind, site,
+                                 elapsed if kind == event else 0.0,
+                                 count=counts[kind])
+        return result
+    return classmethod(_hook)
+
+
+def _count_containers(item):
+    counts = {'hook:dict': 0, 'hook:list': 0}
+    stack = [item]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            counts['hook:dict'] += 1
+            stack.extend(dict.values(node))
+        elif isinstance(node, (list, tuple)):
+            counts['hook:list'] += 1
+            stack.extend(node)
+    return counts
+
+
+def _wrap_missing(profiler, original):
+    def __missing__(self, name):
+        child = original(self, name)
+        site = _site()
+        profiler._children[id(child)] = site
+        profiler._record('missing', site, 0.0)
+        return child
+    return __missing__
+
+
+def _wrap_attach(profiler, original):
+    # a vivified child attaches when it is first written to; it is matched
+    # to the site that created it by id, which the latest child with that
+    # id owns
+    def __attach(self):
+        original(self)
+        site = profiler._children.pop(id(self), None)
+        if site is not None:
+            profiler._record('attach', site, 0.0)
+    return __attach
+
+
+def _wrap_update(profiler, original):
+    def update(self, *args, **kwargs):
+        other = args[0] if len(args) == 1 and not kwargs else kwargs
+        depth = _merge_depth(self, other) if isinstance(other, dict) else 1
+        return profiler._call('update', original, (self,) + args, kwargs,
+                              depth)
+    return update
+
+
+def _timed(event):
+    def wrap(profiler, original):
+        def method(*args, **kwargs):
+            return profiler._call(event, original, args, kwargs)
+        method.__name__ = original.__name__
+        return method
+    return wrap
+
+
+_WRAPPERS = {
+    '__init__': _wrap_init,
+    '_hook': _wrap_hook,
+    '__missing__': _wrap_missing,
+    '_Dict__attach': _wrap_attach,
+    'update': _wrap_update,
+    'to_dict': _timed('to_dict'),
+    '__deepcopy__': _timed('deepcopy'),
+}
+
+
+def _merge_depth(node, other):
+    # The deepest level at which update meets a mapping on both sides
+    deepest = 0
+    stack = [(node, other, 1)]
+    while stack:
+        node, other, level = stack.pop()
+        deepest = max(deepest, level)
+        for key, value in other.items():
+            current = dict.get(node, key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                stack.append((current, value, level + 1))
+    return deepest
+
+
+_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+_COPY = os.path.abspath(copy.__file__)
+_internal_files = {}
+
+
+def _internal(filename):
+    # addict itself, and the copy module that __deepcopy__ is called from
+    try:
+        return _internal_files[filename]
+    except KeyError:
+        path = os.path.abspath(filename)
+        internal = _internal_files[filename] = (
+            os.path.dirname(path) == _PACKAGE or path == _COPY)
+        return internal
+
+
+def _site():
+    frame = sys._getframe(1)
+    while frame is not None and _internal(frame.f_code.co_filename):
+        frame = frame.f_back
+    if frame is None:
+        return '<unknown>'
+    return '{0}:{1} ({2})'.format(frame.f_code.co_filename, frame.f_lineno,
+                                  frame.f_code.co_name)
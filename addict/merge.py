@@ -0,0 +1,124 @@
+from collections import OrderedDict
+
+from .addict import Dict, _convert
+
+
+class Merger(object):
+    # Deep-merges layers of mappings, such as defaults, environment, tenant
+    # and request settings, into a new tree in one pass over all layers.
+    # Later layers win, as with repeated Dict.update calls, and a value that
+    # is not a mapping cuts off the mappings of earlier layers below it.
+    #
+    # lists: 'replace' keeps the last list, 'append' concatenates the lists
+    #        of consecutive layers
+    # conflicts: 'override' lets later values win, 'error' raises a
+    #        ValueError when layers give different values for a key
+    # cache_size: number of merged trees to keep, see merge()
+
+    LISTS = ('replace', 'append')
+    CONFLICTS = ('override', 'error')
+
+    def __init__(self, lists='replace', conflicts='override',
+                 dict_class=Dict, cache_size=0):
+        if lists not in self.LISTS:
+            raise ValueError("unknown list strategy '{0}'".format(lists))
+        if conflicts not in self.CONFLICTS:
+            raise ValueError("unknown conflict strategy '{0}'".format(
+                conflicts))
+        self.lists = lists
+        self.conflicts = conflicts
+        self.dict_class = dict_class
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def merge(self, layers, key=None):
+        # With a cache_size, results are cached under `key`, which should
+        # identify the version of every layer, or else under the identity
+        # of the layers, which is only safe when they are not modified, as
+        # with FrozenDicts. Cached trees are handed out as lazy_copy()s where
+        # the dict_class has them, so changing a result does not change the
+        # cache.
+        layers = tuple(layers)
+        if not self.cache_size:
+            return self._merge(layers)
+        by_identity = key is None
+        if by_identity:
+            key = tuple(id(layer) for layer in layers)
+        entry = self._cache.pop(key, None)
+        if entry is None or (by_identity and any(
+                cached is not layer
+                for cached, layer in zip(entry[0], layers))):
+            entry = (layers if by_identity else None, self._merge(layers))
+            while len(self._cache) >= self.cache_size:
+                self._cache.popitem(last=False)
+        self._cache[key] = entry
+        merged = entry[1]
+        if hasattr(type(merged), 'lazy_copy'):
+            return merged.lazy_copy()
+        return merged
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _merge(self, layers):
+        dict_class = self.dict_class
+        append = self.lists == 'append'
+        strict = self.conflicts == 'error'
+        root = dict_class()
+        stack = [(root, [layer for layer in layers if layer], ())]
+        while stack:
+            target, sources, path = stack.pop()
+            values = {}
+            repeated = {}
+            for source in sources:
+                for key, value in source.items():
+                    if key in values:
+                        try:
+                            repeated[key].append(value)
+                        except KeyError:
+                            repeated[key] = [values[key], value]
+                    values[key] = value
+            for key, value in values.items():
+                if key in repeated:
+                    found = repeated[key]
+                    if strict:
+                        _check(found, path + (key,), append)
+                    if isinstance(value, dict):
+                        run = _run(found, dict)
+                        if len(run) > 1:
+                            child = dict_class()
+                            dict.__setitem__(target, key, child)
+                            stack.append((child, run, path + (key,)))
+                            continue
+                    elif append and isinstance(value, list):
+                        value = [item for items in _run(found, list)
+                                 for item in items]
+                if isinstance(value, (dict, list, tuple)):
+                    value = _convert(value, dict_class, dict)
+                dict.__setitem__(target, key, value)
+        return root
+
+
+def _run(values, kind):
+    # The values of the last layers in a row that are all of kind
+    start = len(values)
+    while start and isinstance(values[start - 1], kind):
+        start -= 1
+    return values[start:]
+
+
+def _check(values, path, append):
+    first = values[0]
+    for value in values[1:]:
+        if isinstance(value, dict) and isinstance(first, dict):
+            continue
+        if append and isinstance(value, list) and isinstance(first, list):
+            continue
+        if value != first:
+            raise ValueError("conflicting values for '{0}'".format(
+                '.'.join(str(key) for key in path)))
+
+
+def merge(*layers):
+    # Layers merged into a new Dict with the default strategies
+    return Merger().merge(layers)
@@ -0,0 +1,59 @@
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+from .addict import Dict
+
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str, bytes)
+
+
+def convert_many(docs, workers=None, dict_class=Dict, chunk_size=1000,
+                 pool=None):
+    # [dict_class(doc) for doc in docs], spread over a process pool in
+    # chunks of chunk_size documents. JSON text is parsed in the workers as
+    # well. The results come back in input order.
+    return _map(partial(_convert_chunk, dict_class), docs, workers,
+                chunk_size, pool)
+
+
+def to_dicts(dicts, workers=None, chunk_size=1000, pool=None):
+    # [d.to_dict() for d in dicts], spread over a process pool
+    return _map(_to_dict_chunk, dicts, workers, chunk_size, pool)
+
+
+def _map(func, items, workers, chunk_size, pool):
+    # workers=1 runs in this process; an existing pool may be passed in to
+    # save starting a new one on every call
+    chunks = _chunks(items, chunk_size)
+    if pool is None and workers == 1:
+        return [item for chunk in map(func, chunks) for item in chunk]
+    own_pool = pool is None
+    if own_pool:
+        pool = Pool(workers)
+    try:
+        return [item for chunk in pool.imap(func, chunks) for item in chunk]
+    finally:
+        if own_pool:
+            pool.terminate()
+
+
+def _chunks(items, size):
+    if size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    items = iter(items)
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
+
+
+def _convert_chunk(dict_class, docs):
+    return [dict_class.from_json(doc) if isinstance(doc, string_types)
+            else dict_class(doc) for doc in docs]
+
+
+def _to_dict_chunk(dicts):
+    return [item.to_dict() for item in dicts]
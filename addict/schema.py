@@ -0,0 +1,234 @@
+import json
+import sys
+from operator import itemgetter
+
+from .addict import Dict, _convert, _reduce, _restore
+
+_CONTAINERS = (dict, list, tuple)
+_PLAIN = frozenset([dict, list])
+
+try:
+    _SCALARS = frozenset([str, unicode, int, long, float, bool, type(None)])
+except NameError:
+    _SCALARS = frozenset([str, bytes, int, float, bool, type(None)])
+_KNOWN = _SCALARS | _PLAIN
+
+
+def compile_schema(schema, name='SchemaDict', base=Dict, module=None):
+    # A Dict subclass for documents of a known shape. schema is a sample
+    # document, whose lists contribute the keys of all the mappings in
+    # them, or a TypedDict. See _SchemaDict for what is precomputed.
+    #
+    # Like a namedtuple, the class pickles when it is bound to `name` in
+    # `module`, which defaults to the caller's module. The classes of
+    # nested mappings hang off it as _schema1, _schema2, ..., and their
+    # instances pickle as a lookup of that attribute on the root class,
+    # since Python 2 finds classes by __name__ only.
+    if module is None:
+        try:
+            module = sys._getframe(1).f_globals.get('__name__', '__main__')
+        except (AttributeError, ValueError):
+            module = __name__
+    shape = _typed_shape(schema) if _is_typed_dict(schema) else _shape(schema)
+    root = _compile(shape, name, base, module, name)
+    index = 0
+    pending = list(root._schema_children.values())
+    while pending:
+        child = pending.pop(0)
+        index += 1
+        attribute = '_schema{0}'.format(index)
+        child.__qualname__ = '{0}.{1}'.format(name, attribute)
+        child._schema_root = root
+        child._schema_attribute = attribute
+        setattr(root, attribute, child)
+        pending.extend(child._schema_children.values())
+    return root
+
+
+def _shape(sample):
+    # {key: shape of the nested mappings under key, or None}
+    shape = {}
+    for key, value in sample.items():
+        nested = _nested_mappings(value)
+        if nested:
+            merged = shape.get(key) or {}
+            for mapping in nested:
+                _merge_shape(merged, _shape(mapping))
+            shape[key] = merged
+        else:
+            shape.setdefault(key, None)
+    return shape
+
+
+def _nested_mappings(value):
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [mapping for item in value
+                for mapping in _nested_mappings(item)]
+    return []
+
+
+def _merge_shape(shape, other):
+    for key, child in other.items():
+        if child is None:
+            shape.setdefault(key, None)
+        else:
+            if shape.get(key) is None:
+                shape[key] = {}
+            _merge_shape(shape[key], child)
+
+
+def _is_typed_dict(schema):
+    return (isinstance(schema, type) and issubclass(schema, dict) and
+            hasattr(schema, '__annotations__'))
+
+
+def _typed_shape(typed_dict):
+    # fields typed with a TypedDict, or with a type that has TypedDict
+    # arguments such as List[...] or Optional[...], are nested mappings
+    import typing
+    shape = {}
+    for key, hint in typing.get_type_hints(typed_dict).items():
+        nested = [arg for arg in (hint,) + getattr(hint, '__args__', ())
+                  if _is_typed_dict(arg)]
+        shape[key] = _typed_shape(nested[0]) if nested else None
+    return shape
+
+
+def _compile(shape, name, base, module, qualname):
+    children = {}
+    for key, child in shape.items():
+        if child is not None:
+            child_name = '{0}_{1}'.format(name, key)
+            children[key] = _compile(child, child_name, base, module,
+                                     child_name)
+    namespace = {
+        '__module__': module,
+        '__qualname__': qualname,
+        '_schema_children': children,
+        '_schema_child_items': tuple(children.items()),
+        '_schema_base': base,
+    }
+    for key in shape:
+        if (isinstance(key, str) and not key.startswith('_') and
+                not hasattr(_SchemaDict, key) and not hasattr(base, key)):
+            namespace[key] = property(itemgetter(key))
+    namespace['_schema_fields'] = frozenset(
+        key for key in shape if key in namespace)
+    return type(name, (_SchemaDict, base), namespace)
+
+
+class _SchemaDict(Dict):
+    # Base of compile_schema classes. Fields are properties over item
+    # lookup, so reading one skips the failed attribute lookup that ends
+    # in Dict.__getattr__. Values are converted by key: mappings under a
+    # field of the schema become its pre-built class, without asking _hook,
+    # and mappings made only of scalars are copied with one dict.update.
+    # Anything outside the schema is converted to the base class as usual.
+    _schema_children = {}
+    _schema_child_items = ()
+    _schema_fields = frozenset()
+    _schema_base = Dict
+    _schema_root = None
+    _schema_attribute = None
+
+    def __init__(__self, *args, **kwargs):
+        if '__parent' in kwargs:
+            Dict.__init__(__self, __parent=kwargs.pop('__parent'),
+                          __key=kwargs.pop('__key', None))
+        for arg in args:
+            if not arg:
+                continue
+            elif isinstance(arg, dict):
+                _fill(__self, arg)
+            elif isinstance(arg, tuple) and (not isinstance(arg[0], tuple)):
+                _fill(__self, dict([arg]))
+            else:
+                _fill(__self, dict(arg))
+        if kwargs:
+            _fill(__self, kwargs)
+
+    def __setattr__(self, name, value):
+        if name in self._schema_fields:
+            self[name] = value
+        else:
+            Dict.__setattr__(self, name, value)
+
+    def __missing__(self, name):
+        if self._Dict__frozen:
+            raise KeyError(name)
+        cls = self._schema_children.get(name, self._schema_base)
+        return cls(__parent=self, __key=name)
+
+    def __reduce_ex__(self, protocol):
+        if self._schema_root is None:
+            return Dict.__reduce_ex__(self, protocol)
+        cls, state, frozen = _reduce(self, _SchemaDict, protocol)[1]
+        return (_restore_schema,
+                (self._schema_root, self._schema_attribute, state, frozen))
+
+    def to_dict(self):
+        # children are of other classes, but all of them derive from base
+        return _convert(self, dict, self._schema_base)
+
+    @classmethod
+    def from_json(cls, source, **kwargs):
+        if hasattr(source, 'read'):
+            item = json.load(source, **kwargs)
+        else:
+            item = json.loads(source, **kwargs)
+        return _build(cls, item) if isinstance(item, dict) else _convert(
+            item, cls, dict)
+
+
+def _restore_schema(root, attribute, state, frozen):
+    return _restore(getattr(root, attribute), state, frozen)
+
+
+def _build(cls, source):
+    new = dict.__new__(cls)
+    _fill(new, source)
+    return new
+
+
+def _fill(node, source):
+    # The types of all values are checked at once: a node of scalars is one
+    # dict.update, and when the only plain dicts and lists are under fields
+    # with a pre-built class, only those are converted.
+    kinds = list(map(type, source.values()))
+    if _SCALARS.issuperset(kinds):
+        dict.update(node, source)
+        return
+    if _KNOWN.issuperset(kinds):
+        dict.update(node, source)
+        found = 0
+        for key, child in node._schema_child_items:
+            value = dict.get(node, key)
+            kind = type(value)
+            if kind is dict:
+                dict.__setitem__(node, key, _build(child, value))
+                found += 1
+            elif kind is list:
+                dict.__setitem__(node, key, _convert_items(value, child))
+                found += 1
+        if found == sum(map(_PLAIN.__contains__, kinds)):
+            return
+    children = node._schema_children
+    base = node._schema_base
+    for key, value in source.items():
+        if isinstance(value, _CONTAINERS):
+            child = children.get(key)
+            if child is None:
+                value = _convert(value, base, dict)
+            elif isinstance(value, dict):
+                value = _build(child, value)
+            else:
+                value = _convert_items(value, child)
+        dict.__setitem__(node, key, value)
+
+
+def _convert_items(items, cls):
+    converted = [_build(cls, item) if isinstance(item, dict)
+                 else _convert(item, cls, dict) for item in items]
+    return converted if type(items) is list else type(items)(converted)
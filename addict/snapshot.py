@@ -0,0 +1,174 @@
+import marshal
+import mmap
+import struct
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+from .addict import Dict, _EMPTY, _convert
+
+
+# A snapshot file is a header followed by one block per mapping or
+# sequence. A block holds a marshalled tuple of the node's keys and values,
+# with None in place of nested nodes, followed by the file offsets of those
+# nested nodes. Blocks are written parents first and the offsets patched in
+# once a child has been written, so shared nodes are stored once.
+_MAGIC = b'ADSNAP'
+_VERSION = 1
+_HEADER = struct.Struct('<6sBBQ')
+_BLOCK = struct.Struct('<cII')
+_OFFSET = struct.Struct('<Q')
+
+
+def write_snapshot(tree, file):
+    # file is a path or a binary file object
+    out = bytearray(_HEADER.size)
+    offsets = {}
+    pending = [(tree, None)]
+    while pending:
+        node, ref = pending.pop()
+        offset = offsets.get(id(node))
+        if offset is None:
+            offset = offsets[id(node)] = len(out)
+            _write_block(node, out, pending)
+        if ref is None:
+            root = offset
+        else:
+            _OFFSET.pack_into(out, ref, offset)
+    _HEADER.pack_into(out, 0, _MAGIC, _VERSION, marshal.version, root)
+    if hasattr(file, 'write'):
+        file.write(out)
+    else:
+        with open(file, 'wb') as fp:
+            fp.write(out)
+
+
+def _write_block(node, out, pending):
+    if isinstance(node, dict):
+        kind = b'd'
+        keys = tuple(node)
+        values = list(node.values())
+    elif isinstance(node, (list, tuple)):
+        kind = b'l'
+        keys = ()
+        values = list(node)
+    else:
+        raise TypeError('a snapshot needs a mapping or a sequence at the '
+                        'root, not {0}'.format(type(node).__name__))
+    children = []
+    for index, value in enumerate(values):
+        if isinstance(value, (dict, list, tuple)):
+            children.append((index, value))
+            values[index] = None
+    data = marshal.dumps((keys, tuple(values),
+                          tuple(index for index, _ in children)))
+    out += _BLOCK.pack(kind, len(data), len(children))
+    out += data
+    table = len(out)
+    out += b'\0' * (_OFFSET.size * len(children))
+    for number, (_, child) in enumerate(children):
+        pending.append((child, table + number * _OFFSET.size))
+
+
+def open_snapshot(path):
+    # Maps the file and returns a view of its root. Nothing but the header
+    # is read until a node is accessed.
+    with open(path, 'rb') as fp:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < _HEADER.size:
+        raise ValueError("'{0}' is not an addict snapshot".format(path))
+    magic, version, marshal_version, root = _HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC:
+        raise ValueError("'{0}' is not an addict snapshot".format(path))
+    if version != _VERSION or marshal_version > marshal.version:
+        raise ValueError("'{0}' was written by an incompatible "
+                         "version".format(path))
+    return _node(buffer, root)
+
+
+def _node(buffer, offset):
+    if buffer[offset:offset + 1] == b'd':
+        return SnapshotDict(buffer, offset)
+    _, values, indexes, offsets = _decode(buffer, offset)
+    if not indexes:
+        return values
+    values = list(values)
+    for index, child in zip(indexes, offsets):
+        values[index] = _node(buffer, child)
+    return tuple(values)
+
+
+def _decode(buffer, offset):
+    # One node: its keys and values, and the offsets of the nested nodes
+    # in place of which the values hold None
+    _, size, count = _BLOCK.unpack_from(buffer, offset)
+    start = offset + _BLOCK.size
+    keys, values, indexes = marshal.loads(buffer[start:start + size])
+    offsets = struct.unpack_from('<{0}Q'.format(count), buffer, start + size)
+    return keys, values, indexes, offsets
+
+
+class SnapshotDict(Mapping):
+    # Read-only view of a mapping in a snapshot file. Its keys and values
+    # are decoded the first time it is accessed; nested mappings are views
+    # themselves and sequences become tuples. Like in a ReadDict, missing
+    # keys read as an empty, read-only mapping.
+    __slots__ = ('_buffer', '_offset', '_items', '_children')
+
+    def __init__(self, buffer, offset):
+        object.__setattr__(self, '_buffer', buffer)
+        object.__setattr__(self, '_offset', offset)
+        object.__setattr__(self, '_items', None)
+
+    def _load(self):
+        items = self._items
+        if items is None:
+            keys, values, indexes, offsets = _decode(self._buffer,
+                                                     self._offset)
+            items = dict(zip(keys, values))
+            # nested nodes are only opened when they are read
+            children = dict(zip([keys[index] for index in indexes], offsets))
+            object.__setattr__(self, '_children', children)
+            object.__setattr__(self, '_items', items)
+        return items
+
+    def __getitem__(self, key):
+        value = self._load().get(key, _EMPTY)
+        if value is None and key in self._children:
+            value = self._items[key] = _node(self._buffer,
+                                              self._children.pop(key))
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("'{0}' object is read-only".format(
+            type(self).__name__))
+
+    __setattr__ = __delattr__ = __setitem__ = __delitem__ = _read_only
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, dict(self.items()))
+
+    def to_dict(self):
+        return _convert(self, dict, SnapshotDict)
+
+    def thaw(self, dict_class=Dict):
+        return _convert(self, dict_class, SnapshotDict)
@@ -0,0 +1,44 @@
+"""
+Nested counting with Aggregator compared with the README's Dict counter.
+"""
+from addict import Aggregator, Dict
+
+from .data import records
+from .runner import benchmark
+
+
+ROWS = records(100000)
+
+
+@benchmark('aggregate.count:Dict')
+def aggregate_count_dict():
+    def run():
+        counter = Dict()
+        for row in ROWS:
+            counter[row['born']][row['gender']][row['eyes']] += 1
+        return counter
+    return run
+
+
+@benchmark('aggregate.count', baseline='aggregate.count:Dict')
+def aggregate_count():
+    keys = ('born', 'gender', 'eyes')
+    return lambda: Aggregator(keys).add_many(ROWS).to_dict()
+
+
+@benchmark('aggregate.mean:Dict')
+def aggregate_mean_dict():
+    def run():
+        totals = Dict()
+        for row in ROWS:
+            group = totals[row['born']][row['gender']]
+            group.count += 1
+            group.sum += row['score']
+        return totals
+    return run
+
+
+@benchmark('aggregate.mean', baseline='aggregate.mean:Dict')
+def aggregate_mean():
+    keys = ('born', 'gender')
+    return lambda: Aggregator(keys, 'score').add_many(ROWS).to_dict('mean')
@@ -0,0 +1,55 @@
+"""
+Building Dicts from asyncio streams compared with the blocking builders on
+the same text. The async builders read in chunks and give the loop a turn
+after each one, and these numbers show what that costs.
+"""
+import asyncio
+import json
+
+from addict import Dict, aiter_ndjson, iter_json_lines
+
+from .data import WIDE_JSON, records
+from .runner import benchmark
+
+
+NDJSON = ''.join(json.dumps(record) + '\n'
+                 for record in records(10000)).encode('utf-8')
+WIDE = WIDE_JSON.encode('utf-8')
+
+
+def _run(coroutine, data):
+    loop = asyncio.new_event_loop()
+
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await coroutine(reader)
+
+    def run():
+        return loop.run_until_complete(read())
+    return run
+
+
+async def _collect(reader):
+    return [record async for record in aiter_ndjson(reader)]
+
+
+@benchmark('aio.from_stream:blocking')
+def from_stream_blocking():
+    return lambda: Dict.from_json(WIDE)
+
+
+@benchmark('aio.from_stream', baseline='aio.from_stream:blocking')
+def from_stream():
+    return _run(Dict.afrom_stream, WIDE)
+
+
+@benchmark('aio.ndjson:blocking')
+def ndjson_blocking():
+    return lambda: list(iter_json_lines(NDJSON.splitlines()))
+
+
+@benchmark('aio.ndjson', baseline='aio.ndjson:blocking')
+def ndjson():
+    return _run(_collect, NDJSON)
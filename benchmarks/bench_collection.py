@@ -0,0 +1,78 @@
+"""
+Queries on a Collection with indexes compared with scanning a list of the
+same Dicts, and the memory the indexes add to each record.
+"""
+from addict import Collection, Dict
+
+from .data import records
+from .runner import benchmark, memory_benchmark
+
+
+RECORDS = records(50000)
+
+
+def _collection():
+    return Collection(RECORDS, indexes=['user.id', 'user.region'],
+                      sorted_indexes=['score'])
+
+
+@benchmark('collection.find:scan')
+def find_scan():
+    dicts = [Dict(record) for record in RECORDS]
+    return lambda: [item for item in dicts if item.user.id == 31337]
+
+
+@benchmark('collection.find', baseline='collection.find:scan')
+def find():
+    collection = _collection()
+    return lambda: collection.find({'user.id': 31337})
+
+
+@benchmark('collection.find.after_write:scan')
+def find_after_write_scan():
+    dicts = [Dict(record) for record in RECORDS]
+
+    def run():
+        dicts[100].user.region = 'eu'
+        return [item for item in dicts
+                if item.user.id == 31337 and item.born == 1997]
+    return run
+
+
+@benchmark('collection.find.after_write',
+           baseline='collection.find.after_write:scan')
+def find_after_write():
+    collection = _collection()
+    record = next(iter(collection))
+
+    def run():
+        record.user.region = 'eu'
+        return collection.find({'user.id': 31337}, born=1997)
+    return run
+
+
+@benchmark('collection.range:scan')
+def range_scan():
+    dicts = [Dict(record) for record in RECORDS]
+    return lambda: sorted((item for item in dicts
+                           if 1000 <= item.score <= 1100),
+                          key=lambda item: item.score)
+
+
+@benchmark('collection.range', baseline='collection.range:scan')
+def range_query():
+    collection = _collection()
+    return lambda: collection.range('score', 1000, 1100)
+
+
+@memory_benchmark('collection.memory:unindexed')
+def memory_unindexed():
+    collection = Collection()
+    return lambda i: collection.add(RECORDS[i])
+
+
+@memory_benchmark('collection.memory', baseline='collection.memory:unindexed')
+def memory_indexed():
+    collection = Collection(indexes=['user.id', 'user.region'],
+                            sorted_indexes=['score'])
+    return lambda i: collection.add(RECORDS[i])
@@ -0,0 +1,30 @@
+"""
+Columnar extraction from a list of Dict records.
+"""
+from addict import Dict, to_columns
+
+from .data import records
+from .runner import benchmark
+
+
+RECORDS = [Dict(record) for record in records(10000)]
+for record in RECORDS[::10]:
+    del record['score']
+
+
+@benchmark('columns:getattr')
+def columns_getattr():
+    def run():
+        born, region, score = [], [], []
+        for record in RECORDS:
+            born.append(record.born)
+            region.append(record.user.region)
+            score.append(record.score if 'score' in record else 0.0)
+        return born, region, score
+    return run
+
+
+@benchmark('columns', baseline='columns:getattr')
+def columns():
+    paths = ['born', 'user.region', 'score']
+    return lambda: to_columns(RECORDS, paths, fill=0.0)
@@ -0,0 +1,75 @@
+"""
+Shared counters and auto-vivifying writes from several threads, with
+ConcurrentDict compared with a Dict behind a single lock.
+
+Each run starts its threads and joins them, so the numbers include thread
+start-up; they show contention rather than parallel speed-up, which the GIL
+rules out on most builds.
+"""
+import threading
+
+from addict import ConcurrentDict, Dict
+
+from .runner import benchmark
+
+
+OPERATIONS = 20000
+THREADS = (1, 2, 4, 8)
+KEYS = ['key{0}'.format(i) for i in range(100)]
+
+
+def _run(threads, work, dict_class):
+    # every run fills a new tree, so writes keep creating nodes
+    def run():
+        tree = dict_class()
+        workers = [threading.Thread(target=work, args=(tree, number, threads))
+                   for number in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return run
+
+
+def _register(threads):
+    @benchmark('concurrent.increment.{0}:locked'.format(threads))
+    def increment_locked():
+        lock = threading.Lock()
+
+        def work(tree, number, threads):
+            for i in range(OPERATIONS // threads):
+                with lock:
+                    counters = tree.counters
+                    key = KEYS[i % 100]
+                    counters[key] = counters.get(key, 0) + 1
+        return _run(threads, work, Dict)
+
+    @benchmark('concurrent.increment.{0}'.format(threads),
+               baseline='concurrent.increment.{0}:locked'.format(threads))
+    def increment():
+        def work(tree, number, threads):
+            for i in range(OPERATIONS // threads):
+                tree.increment(('counters', KEYS[i % 100]))
+        return _run(threads, work, ConcurrentDict)
+
+    @benchmark('concurrent.write.{0}:locked'.format(threads))
+    def write_locked():
+        lock = threading.Lock()
+
+        def work(tree, number, threads):
+            for i in range(OPERATIONS // threads):
+                with lock:
+                    tree[KEYS[i % 100]].worker[number] = i
+        return _run(threads, work, Dict)
+
+    @benchmark('concurrent.write.{0}'.format(threads),
+               baseline='concurrent.write.{0}:locked'.format(threads))
+    def write():
+        def work(tree, number, threads):
+            for i in range(OPERATIONS // threads):
+                tree[KEYS[i % 100]].worker[number] = i
+        return _run(threads, work, ConcurrentDict)
+
+
+for _threads in THREADS:
+    _register(_threads)
@@ -0,0 +1,31 @@
+"""
+Per-request copies of a large template with a few changed leaves.
+"""
+from addict import Dict
+
+from .data import WIDE
+from .runner import benchmark
+
+
+def modify(config):
+    config.key1.owner.region = 'us'
+    config.key2.tags.append('c')
+    config.request.id = 42
+
+
+@benchmark('copy.template:deepcopy')
+def copy_template_deepcopy():
+    template = Dict(WIDE)
+
+    def run():
+        modify(template.deepcopy())
+    return run
+
+
+@benchmark('copy.template', baseline='copy.template:deepcopy')
+def copy_template():
+    template = Dict(WIDE)
+
+    def run():
+        modify(template.lazy_copy())
+    return run
@@ -0,0 +1,200 @@
+"""
+Hot paths of Dict compared with plain dict and json.
+"""
+import copy
+import json
+import pickle
+
+from addict import Dict
+
+from .data import (DEEP, DEEP_JSON, WIDE, WIDE_JSON, copy_tree,
+                   deep_document)
+from .runner import benchmark
+
+
+@benchmark('construct.deep:json')
+def construct_deep_json():
+    return lambda: json.loads(DEEP_JSON)
+
+
+@benchmark('construct.deep', baseline='construct.deep:json')
+def construct_deep():
+    return lambda: Dict(json.loads(DEEP_JSON))
+
+
+@benchmark('construct.wide:json')
+def construct_wide_json():
+    return lambda: json.loads(WIDE_JSON)
+
+
+@benchmark('construct.wide', baseline='construct.wide:json')
+def construct_wide():
+    return lambda: Dict(json.loads(WIDE_JSON))
+
+
+# deeper than the interpreter's recursion limit allows a recursive walk
+VERY_DEEP = deep_document(5000)
+
+
+@benchmark('construct.very_deep')
+def construct_very_deep():
+    return lambda: Dict(VERY_DEEP)
+
+
+@benchmark('getattr.chain:dict')
+def getattr_chain_dict():
+    doc = {'a': {'b': {'c': {'d': 1}}}}
+    return lambda: doc['a']['b']['c']['d']
+
+
+@benchmark('getattr.chain', baseline='getattr.chain:dict')
+def getattr_chain():
+    doc = Dict({'a': {'b': {'c': {'d': 1}}}})
+    return lambda: doc.a.b.c.d
+
+
+@benchmark('getitem.chain', baseline='getattr.chain:dict')
+def getitem_chain():
+    doc = Dict({'a': {'b': {'c': {'d': 1}}}})
+    return lambda: doc['a']['b']['c']['d']
+
+
+@benchmark('getattr.missing', baseline='getattr.chain:dict')
+def getattr_missing():
+    doc = Dict()
+    return lambda: doc.a.b.c.d
+
+
+@benchmark('setattr.vivify:dict')
+def setattr_vivify_dict():
+    def run():
+        doc = {}
+        doc.setdefault('a', {}).setdefault('b', {})['c'] = 1
+    return run
+
+
+@benchmark('setattr.vivify', baseline='setattr.vivify:dict')
+def setattr_vivify():
+    def run():
+        doc = Dict()
+        doc.a.b.c = 1
+    return run
+
+
+@benchmark('setitem.bulk:dict')
+def setitem_bulk_dict():
+    keys = ['key{0}'.format(i) for i in range(1000)]
+
+    def run():
+        doc = {}
+        for key in keys:
+            doc[key] = 1
+    return run
+
+
+@benchmark('setitem.bulk', baseline='setitem.bulk:dict')
+def setitem_bulk():
+    keys = ['key{0}'.format(i) for i in range(1000)]
+
+    def run():
+        doc = Dict()
+        for key in keys:
+            doc[key] = 1
+    return run
+
+
+@benchmark('setitem.bulk.attached', baseline='setitem.bulk:dict')
+def setitem_bulk_attached():
+    keys = ['key{0}'.format(i) for i in range(1000)]
+
+    def run():
+        doc = Dict()
+        child = doc.child
+        child.first = 1
+        for key in keys:
+            child[key] = 1
+    return run
+
+
+@benchmark('setattr.bulk', baseline='setitem.bulk:dict')
+def setattr_bulk():
+    keys = ['key{0}'.format(i) for i in range(1000)]
+
+    def run():
+        doc = Dict()
+        for key in keys:
+            setattr(doc, key, 1)
+    return run
+
+
+@benchmark('update.wide:dict')
+def update_wide_dict():
+    return lambda: copy_tree(WIDE).update(WIDE)
+
+
+@benchmark('update.wide', baseline='update.wide:dict')
+def update_wide():
+    source = Dict(WIDE)
+    return lambda: Dict(WIDE).update(source)
+
+
+@benchmark('to_dict.wide:dict')
+def to_dict_wide_dict():
+    return lambda: copy_tree(WIDE)
+
+
+@benchmark('to_dict.wide', baseline='to_dict.wide:dict')
+def to_dict_wide():
+    doc = Dict(WIDE)
+    return doc.to_dict
+
+
+@benchmark('to_dict.deep:dict')
+def to_dict_deep_dict():
+    return lambda: copy_tree(DEEP)
+
+
+@benchmark('to_dict.deep', baseline='to_dict.deep:dict')
+def to_dict_deep():
+    doc = Dict(DEEP)
+    return doc.to_dict
+
+
+@benchmark('to_dict.very_deep')
+def to_dict_very_deep():
+    doc = Dict(VERY_DEEP)
+    return doc.to_dict
+
+
+@benchmark('deepcopy.wide:dict')
+def deepcopy_wide_dict():
+    return lambda: copy.deepcopy(WIDE)
+
+
+@benchmark('deepcopy.wide', baseline='deepcopy.wide:dict')
+def deepcopy_wide():
+    doc = Dict(WIDE)
+    return doc.deepcopy
+
+
+@benchmark('pickle.wide:dict')
+def pickle_wide_dict():
+    return lambda: pickle.loads(pickle.dumps(WIDE, -1))
+
+
+@benchmark('pickle.wide', baseline='pickle.wide:dict')
+def pickle_wide():
+    doc = Dict(WIDE)
+    return lambda: pickle.loads(pickle.dumps(doc, -1))
+
+
+@benchmark('freeze.wide')
+def freeze_wide():
+    doc = Dict(WIDE)
+    return doc.freeze
+
+
+@benchmark('freeze.very_deep')
+def freeze_very_deep():
+    doc = Dict(VERY_DEEP)
+    return doc.freeze
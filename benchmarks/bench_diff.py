@@ -0,0 +1,65 @@
+"""
+Change tracking compared with resending the whole document, and diffs of
+trees that share their unchanged subtrees compared with diffs of copies.
+"""
+from addict import Dict, checkpoint, diff, track
+
+from .data import WIDE
+from .runner import benchmark
+
+
+KEYS = ['key{0}'.format(i) for i in range(1000)]
+CHANGED = KEYS[::100]
+
+
+@benchmark('setitem.bulk.tracked', baseline='setitem.bulk')
+def setitem_bulk_tracked():
+    def run():
+        doc = track(Dict())
+        for key in KEYS:
+            doc[key] = 1
+    return run
+
+
+@benchmark('checkpoint.wide:to_dict')
+def checkpoint_wide_to_dict():
+    doc = Dict(WIDE)
+
+    def run():
+        for key in CHANGED:
+            doc[key].owner.region = 'us'
+        return doc.to_dict()
+    return run
+
+
+@benchmark('checkpoint.wide', baseline='checkpoint.wide:to_dict')
+def checkpoint_wide():
+    doc = track(Dict(WIDE))
+
+    def run():
+        for key in CHANGED:
+            doc[key].owner.region = 'us'
+        return checkpoint(doc)
+    return run
+
+
+def _changed(old, new):
+    for key in CHANGED:
+        new[key] = Dict(old[key], name='changed')
+    return old, new
+
+
+@benchmark('diff.wide:copied')
+def diff_wide_copied():
+    old, new = _changed(Dict(WIDE), Dict(WIDE))
+    return lambda: diff(old, new)
+
+
+@benchmark('diff.wide.shared', baseline='diff.wide:copied')
+def diff_wide_shared():
+    old = Dict(WIDE)
+    new = Dict()
+    for key in old:
+        new[key] = old[key]
+    old, new = _changed(old, new)
+    return lambda: diff(old, new)
@@ -0,0 +1,54 @@
+"""
+FrozenDict hashing and equality, e.g. as an lru_cache key.
+"""
+import json
+
+from addict import Dict, FrozenDict
+
+from .data import WIDE
+from .runner import benchmark
+
+
+@benchmark('frozen.build:freeze')
+def frozen_build_freeze():
+    doc = Dict(WIDE)
+
+    def run():
+        doc.freeze()
+        doc.unfreeze()
+    return run
+
+
+@benchmark('frozen.build', baseline='frozen.build:freeze')
+def frozen_build():
+    doc = Dict(WIDE)
+    return lambda: FrozenDict(doc)
+
+
+@benchmark('frozen.key:json')
+def frozen_key_json():
+    doc = Dict(WIDE)
+    return lambda: hash(json.dumps(doc, sort_keys=True))
+
+
+@benchmark('frozen.key', baseline='frozen.key:json')
+def frozen_key():
+    frozen = FrozenDict(WIDE)
+    hash(frozen)
+    return lambda: hash(frozen)
+
+
+@benchmark('frozen.eq:dict')
+def frozen_eq_dict():
+    first, second = Dict(WIDE), Dict(WIDE)
+    second.key999.id = -1
+    return lambda: first == second
+
+
+@benchmark('frozen.eq', baseline='frozen.eq:dict')
+def frozen_eq():
+    first, second = FrozenDict(WIDE), Dict(WIDE)
+    second.key999.id = -1
+    second = FrozenDict(second)
+    hash(first), hash(second)
+    return lambda: first == second
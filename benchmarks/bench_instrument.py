@@ -0,0 +1,39 @@
+"""
+The cost of a Profiler: building, updating and copying Dicts while one is
+running, and after one has been stopped, compared with never starting one.
+"""
+from addict import Dict, Profiler
+
+from .data import records
+from .runner import benchmark
+
+
+RECORDS = records(2000)
+
+
+def _work():
+    built = [Dict(record) for record in RECORDS]
+    for item in built:
+        item.update({'user': {'seen': True}})
+        item.extra.flag = True
+    return [item.to_dict() for item in built]
+
+
+@benchmark('profiler.work:never_started')
+def work_never_started():
+    return _work
+
+
+@benchmark('profiler.work:stopped', baseline='profiler.work:never_started')
+def work_stopped():
+    with Profiler():
+        _work()
+    return _work
+
+
+@benchmark('profiler.work', baseline='profiler.work:never_started')
+def work():
+    def run():
+        with Profiler():
+            return _work()
+    return run
@@ -0,0 +1,94 @@
+"""
+Building Dicts from JSON in one pass compared with json.loads + Dict.
+"""
+import io
+import json
+
+from addict import Dict, iter_json_lines
+
+from .data import DEEP_JSON, WIDE_JSON, records
+from .runner import benchmark, peak_memory_benchmark
+
+
+NDJSON = ''.join(json.dumps(record) + '\n' for record in records(10000))
+
+
+@benchmark('from_json.wide:two_pass')
+def from_json_wide_two_pass():
+    return lambda: Dict(json.loads(WIDE_JSON))
+
+
+@benchmark('from_json.wide', baseline='from_json.wide:two_pass')
+def from_json_wide():
+    return lambda: Dict.from_json(WIDE_JSON)
+
+
+@benchmark('from_json.deep:two_pass')
+def from_json_deep_two_pass():
+    return lambda: Dict(json.loads(DEEP_JSON))
+
+
+@benchmark('from_json.deep', baseline='from_json.deep:two_pass')
+def from_json_deep():
+    return lambda: Dict.from_json(DEEP_JSON)
+
+
+@benchmark('json_lines:two_pass')
+def json_lines_two_pass():
+    def run():
+        for line in io.StringIO(NDJSON):
+            Dict(json.loads(line))
+    return run
+
+
+@benchmark('json_lines', baseline='json_lines:two_pass')
+def json_lines():
+    def run():
+        for record in iter_json_lines(io.StringIO(NDJSON)):
+            pass
+    return run
+
+
+@benchmark('json_lines.interned', baseline='json_lines')
+def json_lines_interned():
+    interned = Dict.interned_class()
+
+    def run():
+        for record in iter_json_lines(io.StringIO(NDJSON),
+                                      dict_class=interned):
+            pass
+    return run
+
+
+LARGE = Dict.from_json(json.dumps(records(20000)).join(['{"rows": ', '}']))
+
+
+class NullWriter(object):
+
+    def write(self, data):
+        pass
+
+
+@benchmark('to_json:to_dict')
+def to_json_to_dict():
+    return lambda: json.dumps(LARGE.to_dict())
+
+
+@benchmark('to_json', baseline='to_json:to_dict')
+def to_json():
+    return LARGE.to_json
+
+
+@peak_memory_benchmark('to_json.peak:to_dict')
+def to_json_peak_to_dict():
+    return lambda: json.dumps(LARGE.to_dict())
+
+
+@peak_memory_benchmark('to_json.peak', baseline='to_json.peak:to_dict')
+def to_json_peak():
+    return LARGE.to_json
+
+
+@peak_memory_benchmark('dump.chunked.peak', baseline='to_json.peak:to_dict')
+def dump_chunked_peak():
+    return lambda: LARGE.dump(NullWriter(), chunk_size=1 << 16)
@@ -0,0 +1,96 @@
+"""
+Memory per small record for dict, Dict and CompactDict, and per record of
+an NDJSON corpus with and without interned keys.
+"""
+import json
+
+from addict import CompactDict, Dict
+
+from .runner import memory_benchmark
+
+
+def record(i):
+    return {'id': i, 'name': 'user', 'active': True}
+
+
+def nested_record(i):
+    return {'id': i, 'owner': {'id': i, 'region': 'eu'}}
+
+
+@memory_benchmark('memory.record:dict')
+def memory_record_dict():
+    return record
+
+
+@memory_benchmark('memory.record', baseline='memory.record:dict')
+def memory_record():
+    return lambda i: Dict(record(i))
+
+
+@memory_benchmark('memory.record.compact', baseline='memory.record:dict')
+def memory_record_compact():
+    return lambda i: CompactDict(record(i))
+
+
+@memory_benchmark('memory.nested:dict')
+def memory_nested_dict():
+    return nested_record
+
+
+@memory_benchmark('memory.nested', baseline='memory.nested:dict')
+def memory_nested():
+    return lambda i: Dict(nested_record(i))
+
+
+@memory_benchmark('memory.nested.compact', baseline='memory.nested:dict')
+def memory_nested_compact():
+    return lambda i: CompactDict(nested_record(i))
+
+
+def frozen(cls):
+    def make(i):
+        obj = cls(nested_record(i))
+        obj.freeze()
+        return obj
+    return make
+
+
+@memory_benchmark('memory.frozen', baseline='memory.nested:dict')
+def memory_frozen():
+    return frozen(Dict)
+
+
+@memory_benchmark('memory.frozen.compact', baseline='memory.nested:dict')
+def memory_frozen_compact():
+    return frozen(CompactDict)
+
+
+def event(i):
+    return {'id': i, 'type': ('view', 'click', 'purchase')[i % 3],
+            'timestamp': 1600000000 + i,
+            'user': {'id': i % 977, 'region': ('eu', 'us', 'apac')[i % 3],
+                     'plan': 'free' if i % 4 else 'pro'},
+            'device': {'os': ('ios', 'android', 'web')[i % 3],
+                       'version': '1.{0}'.format(i % 10)},
+            'items': [{'sku': 'sku{0}'.format(i % 50), 'quantity': 1,
+                       'price': 9.5}]}
+
+
+EVENTS = [json.dumps(event(i)) for i in range(10000)]
+
+
+@memory_benchmark('memory.ndjson')
+def memory_ndjson():
+    return lambda i: Dict.from_json(EVENTS[i])
+
+
+@memory_benchmark('memory.ndjson.interned', baseline='memory.ndjson')
+def memory_ndjson_interned():
+    interned = Dict.interned_class()
+    return lambda i: interned.from_json(EVENTS[i])
+
+
+@memory_benchmark('memory.ndjson.compact_interned', baseline='memory.ndjson')
+def memory_ndjson_compact_interned():
+    interned = CompactDict.interned_class()
+    return lambda i: interned.from_json(EVENTS[i])
@@ -0,0 +1,40 @@
+"""
+Merging layered configurations with Merger compared with Dict.update.
+"""
+from addict import Dict, FrozenDict, Merger
+
+from .data import wide_document
+from .runner import benchmark
+
+
+def _layer(number, step):
+    return dict(('key{0}'.format(i),
+                 {'owner': {'region': 'r{0}'.format(number)},
+                  'layer': number})
+                for i in range(0, 1000, step))
+
+
+LAYERS = [wide_document(1000), _layer(1, 2), _layer(2, 5), _layer(3, 50)]
+
+
+@benchmark('merge.layers:update')
+def merge_layers_update():
+    def run():
+        merged = Dict(LAYERS[0])
+        for layer in LAYERS[1:]:
+            merged.update(Dict(layer))
+        return merged
+    return run
+
+
+@benchmark('merge.layers', baseline='merge.layers:update')
+def merge_layers():
+    merger = Merger()
+    return lambda: merger.merge(LAYERS)
+
+
+@benchmark('merge.layers.cached', baseline='merge.layers:update')
+def merge_layers_cached():
+    merger = Merger(cache_size=16)
+    layers = [FrozenDict(layer) for layer in LAYERS]
+    return lambda: merger.merge(layers)
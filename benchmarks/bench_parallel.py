@@ -0,0 +1,52 @@
+"""
+Batch conversion on a process pool compared with converting in a loop.
+
+The pools are started once, outside the timed code; the results only show
+scaling on a machine with at least as many cores as workers.
+"""
+import atexit
+from multiprocessing import Pool
+
+from addict import Dict, convert_many, to_dicts
+
+from .data import records
+from .runner import benchmark
+
+
+DOCS = records(50000)
+WORKERS = (2, 4)
+
+
+def _pool(workers):
+    pool = Pool(workers)
+    atexit.register(pool.terminate)
+    return pool
+
+
+@benchmark('convert_many:loop')
+def convert_many_loop():
+    return lambda: [Dict(doc) for doc in DOCS]
+
+
+@benchmark('to_dicts:loop')
+def to_dicts_loop():
+    dicts = [Dict(doc) for doc in DOCS]
+    return lambda: [item.to_dict() for item in dicts]
+
+
+def _register(workers):
+    @benchmark('convert_many.{0}'.format(workers),
+               baseline='convert_many:loop')
+    def convert_many_pool():
+        pool = _pool(workers)
+        return lambda: convert_many(DOCS, pool=pool)
+
+    @benchmark('to_dicts.{0}'.format(workers), baseline='to_dicts:loop')
+    def to_dicts_pool():
+        pool = _pool(workers)
+        dicts = [Dict(doc) for doc in DOCS]
+        return lambda: to_dicts(dicts, pool=pool)
+
+
+for _workers in WORKERS:
+    _register(_workers)
@@ -0,0 +1,69 @@
+"""
+Dotted-path access compared with chained attributes.
+"""
+from addict import Dict
+
+from .runner import benchmark
+
+
+PREFIX = 'query.filtered.filter.term'
+LEAVES = ['field{0}'.format(i) for i in range(1000)]
+PATHS = ['{0}.{1}'.format(PREFIX, leaf) for leaf in LEAVES]
+
+
+def document():
+    doc = Dict()
+    for leaf in LEAVES:
+        doc.query.filtered.filter.term[leaf] = leaf
+    return doc
+
+
+@benchmark('path.get:getattr')
+def path_get_getattr():
+    doc = document()
+    return lambda: doc.query.filtered.filter.term.created_by
+
+
+@benchmark('path.get', baseline='path.get:getattr')
+def path_get():
+    doc = document()
+    return lambda: doc.get_path('query.filtered.filter.term.created_by')
+
+
+@benchmark('path.get_many:getattr')
+def path_get_many_getattr():
+    doc = document()
+
+    def run():
+        return [doc.query.filtered.filter.term[leaf] for leaf in LEAVES]
+    return run
+
+
+@benchmark('path.get_many', baseline='path.get_many:getattr')
+def path_get_many():
+    doc = document()
+    return lambda: doc.get_many(PATHS)
+
+
+@benchmark('path.set_many:setattr')
+def path_set_many_setattr():
+    def run():
+        doc = Dict()
+        for leaf in LEAVES:
+            doc.query.filtered.filter.term[leaf] = leaf
+    return run
+
+
+@benchmark('path.set_many:set_path', baseline='path.set_many:setattr')
+def path_set_many_set_path():
+    def run():
+        doc = Dict()
+        for path, leaf in zip(PATHS, LEAVES):
+            doc.set_path(path, leaf)
+    return run
+
+
+@benchmark('path.set_many', baseline='path.set_many:setattr')
+def path_set_many():
+    values = dict(zip(PATHS, LEAVES))
+    return lambda: Dict().set_many(values)
@@ -0,0 +1,79 @@
+"""
+Pickle round trips and payload sizes of Dicts, compared with the encoding
+Dict used before: the items as __getnewargs__, then the whole Dict again as
+state, merged back in by the recursive update().
+"""
+import pickle
+
+from addict import Dict
+
+from .data import WIDE, records
+from .runner import benchmark, size_benchmark
+
+
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class LegacyDict(Dict):
+
+    __reduce_ex__ = object.__reduce_ex__
+
+    def __getnewargs__(self):
+        return tuple(self.items())
+
+    def __getstate__(self):
+        return self
+
+    def __setstate__(self, state):
+        self.update(state)
+
+
+def _round_trip(value):
+    return lambda: pickle.loads(pickle.dumps(value, PROTOCOL))
+
+
+def _size(value):
+    return lambda: pickle.dumps(value, PROTOCOL)
+
+
+DOCUMENTS = {
+    'records': lambda cls: [cls(record) for record in records(10000)],
+    'wide': lambda cls: cls(WIDE),
+}
+
+
+def _register(name, make):
+    @benchmark('pickle.round_trip.{0}:legacy'.format(name))
+    def pickle_legacy():
+        return _round_trip(make(LegacyDict))
+
+    @benchmark('pickle.round_trip.{0}'.format(name),
+               baseline='pickle.round_trip.{0}:legacy'.format(name))
+    def pickle_dict():
+        return _round_trip(make(Dict))
+
+    @size_benchmark('pickle_size.{0}:legacy'.format(name))
+    def pickle_size_legacy():
+        return _size(make(LegacyDict))
+
+    @size_benchmark('pickle_size.{0}'.format(name),
+                    baseline='pickle_size.{0}:legacy'.format(name))
+    def pickle_size_dict():
+        return _size(make(Dict))
+
+
+for _name, _make in sorted(DOCUMENTS.items()):
+    _register(_name, _make)
+
+
+if PROTOCOL >= 5:
+    BLOBS = Dict(('blob{0}'.format(i), b'x' * (1 << 20)) for i in range(16))
+
+    @size_benchmark('pickle_size.blobs:in_band')
+    def pickle_size_blobs_in_band():
+        return _size(BLOBS)
+
+    @size_benchmark('pickle_size.blobs', baseline='pickle_size.blobs:in_band')
+    def pickle_size_blobs():
+        return lambda: pickle.dumps(BLOBS, PROTOCOL,
+                                    buffer_callback=lambda buffer: None)
@@ -0,0 +1,64 @@
+"""
+Code that probes objects with hasattr() and getattr() before serializing,
+copying or printing them, on Dict and on Dict.probing_class().
+"""
+import copy
+import json
+import pprint
+
+from addict import Dict
+
+from .data import records
+from .runner import benchmark
+
+
+RECORDS = records(2000)
+Probing = Dict.probing_class()
+
+
+def _encode(item):
+    # The checks a typical serializer makes before falling back to a dict;
+    # on a Dict each probe returns a new child, which is not callable
+    for name in ('__html__', '__json__', '_asdict', 'isoformat'):
+        method = getattr(item, name, None)
+        if callable(method):
+            return method()
+    if isinstance(item, dict):
+        return dict((key, _encode(value)) for key, value in item.items())
+    return item
+
+
+def _workload(dict_class):
+    built = [dict_class(record) for record in RECORDS]
+
+    def run():
+        json.dumps([_encode(item) for item in built])
+        pprint.pformat([_encode(item) for item in built[:200]])
+        return [copy.deepcopy(_encode(item)) for item in built[:200]]
+    return run
+
+
+@benchmark('probe.serialize:dict')
+def serialize_dict():
+    return _workload(Dict)
+
+
+@benchmark('probe.serialize', baseline='probe.serialize:dict')
+def serialize():
+    return _workload(Probing)
+
+
+def _probes(dict_class):
+    built = [dict_class(record) for record in RECORDS]
+    return lambda: [(hasattr(item, '__html__'), getattr(item, '_asdict', None))
+                    for item in built]
+
+
+@benchmark('probe.hasattr:dict')
+def hasattr_dict():
+    return _probes(Dict)
+
+
+@benchmark('probe.hasattr', baseline='probe.hasattr:dict')
+def hasattr_probing():
+    return _probes(Probing)
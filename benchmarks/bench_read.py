@@ -0,0 +1,30 @@
+"""
+ReadDict attribute reads compared with Dict.
+"""
+from addict import Dict, ReadDict
+
+from .runner import benchmark
+
+
+@benchmark('read.present:Dict')
+def read_present_dict():
+    doc = Dict({'db': {'primary': {'host': 'localhost'}}})
+    return lambda: doc.db.primary.host
+
+
+@benchmark('read.present', baseline='read.present:Dict')
+def read_present():
+    doc = ReadDict({'db': {'primary': {'host': 'localhost'}}})
+    return lambda: doc.db.primary.host
+
+
+@benchmark('read.missing:Dict')
+def read_missing_dict():
+    doc = Dict({'db': {}})
+    return lambda: doc.db.replica.host
+
+
+@benchmark('read.missing', baseline='read.missing:Dict')
+def read_missing():
+    doc = ReadDict({'db': {}})
+    return lambda: doc.db.replica.host
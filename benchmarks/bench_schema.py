@@ -0,0 +1,34 @@
+"""
+A class compiled from a sample record compared with the generic Dict:
+building records, and reading nested fields by attribute.
+"""
+from addict import Dict, compile_schema
+
+from .data import records
+from .runner import benchmark
+
+
+RECORDS = records(10000)
+Record = compile_schema(RECORDS[0], 'Record')
+
+
+@benchmark('schema.build:generic')
+def build_generic():
+    return lambda: [Dict(record) for record in RECORDS]
+
+
+@benchmark('schema.build', baseline='schema.build:generic')
+def build():
+    return lambda: [Record(record) for record in RECORDS]
+
+
+@benchmark('schema.read:generic')
+def read_generic():
+    built = [Dict(record) for record in RECORDS]
+    return lambda: [(item.user.region, item.born) for item in built]
+
+
+@benchmark('schema.read', baseline='schema.read:generic')
+def read():
+    built = [Record(record) for record in RECORDS]
+    return lambda: [(item.user.region, item.born) for item in built]
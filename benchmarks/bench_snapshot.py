@@ -0,0 +1,58 @@
+"""
+Opening a snapshot file and reading a few values, compared with loading the
+same document from a pickle.
+"""
+import atexit
+import os
+import pickle
+import tempfile
+
+from addict import Dict, open_snapshot, write_snapshot
+
+from .data import wide_document
+from .runner import benchmark, peak_memory_benchmark
+
+
+DOCUMENT = Dict(wide_document(50000))
+
+
+def _temporary(write):
+    handle, path = tempfile.mkstemp()
+    with os.fdopen(handle, 'wb') as fp:
+        write(fp)
+    atexit.register(os.remove, path)
+    return path
+
+
+PICKLE = _temporary(lambda fp: pickle.dump(DOCUMENT, fp, -1))
+SNAPSHOT = _temporary(lambda fp: write_snapshot(DOCUMENT, fp))
+
+
+def load_pickle():
+    with open(PICKLE, 'rb') as fp:
+        doc = pickle.load(fp)
+    return doc.key4242.owner.region
+
+
+def load_snapshot():
+    return open_snapshot(SNAPSHOT).key4242.owner.region
+
+
+@benchmark('snapshot.open:pickle')
+def snapshot_open_pickle():
+    return load_pickle
+
+
+@benchmark('snapshot.open', baseline='snapshot.open:pickle')
+def snapshot_open():
+    return load_snapshot
+
+
+@peak_memory_benchmark('snapshot.peak:pickle')
+def snapshot_peak_pickle():
+    return load_pickle
+
+
+@peak_memory_benchmark('snapshot.peak', baseline='snapshot.peak:pickle')
+def snapshot_peak():
+    return load_snapshot
@@ -0,0 +1,40 @@
+"""
+Documents shared by the benchmarks.
+"""
+import json
+
+
+def deep_document(depth=50):
+    doc = {'leaf': [1, 2, 3]}
+    for level in range(depth):
+        doc = {'level{0}'.format(level): doc, 'value': level}
+    return doc
+
+
+def wide_document(width=1000):
+    return dict(('key{0}'.format(i),
+                 {'id': i, 'name': 'item{0}'.format(i), 'tags': ['a', 'b'],
+                  'owner': {'id': i % 7, 'region': 'eu'}})
+                for i in range(width))
+
+
+def records(count=1000):
+    return [{'born': 1980 + i % 20, 'gender': 'MF'[i % 2],
+             'eyes': ('green', 'blue', 'brown')[i % 3],
+             'user': {'id': i, 'region': ('eu', 'us', 'apac')[i % 3]},
+             'score': i * 0.5}
+            for i in range(count)]
+
+
+def copy_tree(item):
+    if isinstance(item, dict):
+        return dict((key, copy_tree(value)) for key, value in item.items())
+    elif isinstance(item, (list, tuple)):
+        return type(item)(copy_tree(elem) for elem in item)
+    return item
+
+
+DEEP = deep_document()
+WIDE = wide_document()
+DEEP_JSON = json.dumps(DEEP)
+WIDE_JSON = json.dumps(WIDE)
@@ -0,0 +1,252 @@
+"""
+Benchmark runner for addict.
+
+Benchmarks live in the ``bench_*`` modules of this package and register
+themselves with the ``benchmark`` decorator. A benchmark is a setup function
+returning the zero-argument callable that gets timed. Passing ``baseline``
+names the plain ``dict``/``json`` counterpart the result is compared to.
+
+Memory benchmarks are registered with ``memory_benchmark``; their setup
+function returns a factory ``make(i)`` and the result is the number of bytes
+``tracemalloc`` attributes to each object it builds. ``peak_memory_benchmark``
+instead reports the peak number of bytes allocated while running the
+callable its setup function returns, and ``size_benchmark`` reports the
+length of what that callable returns, such as an encoded payload.
+
+Run the suite from the repository root with
+
+    python -m benchmarks -o results.json
+    python -m benchmarks --compare results.json --threshold 1.25
+
+The second form exits with status 1 when any benchmark took more than
+``threshold`` times the time (or memory) of its stored result.
+"""
+import argparse
+import fnmatch
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import sys
+import timeit
+import tracemalloc
+from collections import OrderedDict
+
+import addict
+
+
+BENCHMARKS = OrderedDict()
+
+
+class Benchmark(object):
+
+    def __init__(self, name, setup, baseline=None):
+        self.name = name
+        self.setup = setup
+        self.baseline = baseline
+
+    def run(self, repeat, min_time):
+        func = self.setup()
+        timer = timeit.Timer(func)
+        number = 1
+        while timer.timeit(number) < min_time / repeat:
+            number *= 2
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        return {'value': best, 'unit': 's', 'number': number}
+
+
+class MemoryBenchmark(Benchmark):
+
+    def __init__(self, name, setup, baseline=None, count=10000):
+        super(MemoryBenchmark, self).__init__(name, setup, baseline)
+        self.count = count
+
+    def run(self, repeat, min_time):
+        make = self.setup()
+        best = None
+        for _ in range(repeat):
+            tracemalloc.start()
+            try:
+                start = tracemalloc.get_traced_memory()[0]
+                objects = [make(i) for i in range(self.count)]
+                used = tracemalloc.get_traced_memory()[0] - start
+            finally:
+                tracemalloc.stop()
+            # the list holding the objects is not part of the measurement
+            used -= sys.getsizeof(objects)
+            del objects
+            if best is None or used < best:
+                best = used
+        return {'value': float(best) / self.count, 'unit': 'B',
+                'number': self.count}
+
+
+class PeakMemoryBenchmark(Benchmark):
+
+    def run(self, repeat, min_time):
+        func = self.setup()
+        best = None
+        for _ in range(repeat):
+            tracemalloc.start()
+            try:
+                start = tracemalloc.get_traced_memory()[0]
+                func()
+                used = tracemalloc.get_traced_memory()[1] - start
+            finally:
+                tracemalloc.stop()
+            if best is None or used < best:
+                best = used
+        return {'value': float(best), 'unit': 'B', 'number': 1}
+
+
+class SizeBenchmark(Benchmark):
+
+    def run(self, repeat, min_time):
+        return {'value': float(len(self.setup()())), 'unit': 'B',
+                'number': 1}
+
+
+def _register(bench):
+    if bench.name in BENCHMARKS:
+        raise ValueError("duplicate benchmark '{0}'".format(bench.name))
+    BENCHMARKS[bench.name] = bench
+
+
+def benchmark(name, baseline=None):
+    def decorator(setup):
+        _register(Benchmark(name, setup, baseline))
+        return setup
+    return decorator
+
+
+def memory_benchmark(name, baseline=None, count=10000):
+    def decorator(setup):
+        _register(MemoryBenchmark(name, setup, baseline, count))
+        return setup
+    return decorator
+
+
+def peak_memory_benchmark(name, baseline=None):
+    def decorator(setup):
+        _register(PeakMemoryBenchmark(name, setup, baseline))
+        return setup
+    return decorator
+
+
+def size_benchmark(name, baseline=None):
+    def decorator(setup):
+        _register(SizeBenchmark(name, setup, baseline))
+        return setup
+    return decorator
+
+
+def load_benchmarks():
+    path = os.path.dirname(os.path.abspath(__file__))
+    for _, module, _ in pkgutil.iter_modules([path]):
+        if module.startswith('bench_'):
+            importlib.import_module('{0}.{1}'.format(__package__, module))
+
+
+def select(patterns):
+    if not patterns:
+        return list(BENCHMARKS.values())
+    selected = [b for b in BENCHMARKS.values()
+                if any(fnmatch.fnmatch(b.name, p) for p in patterns)]
+    # baselines are always run alongside the benchmarks that refer to them
+    names = set(b.name for b in selected)
+    for bench in list(selected):
+        if bench.baseline and bench.baseline not in names:
+            selected.append(BENCHMARKS[bench.baseline])
+            names.add(bench.baseline)
+    return selected
+
+
+def run(benchmarks, repeat=5, min_time=0.2, stream=sys.stdout):
+    results = OrderedDict()
+    for bench in benchmarks:
+        results[bench.name] = bench.run(repeat, min_time)
+        results[bench.name]['baseline'] = bench.baseline
+    for name, result in results.items():
+        baseline = results.get(result['baseline'])
+        if baseline is not None:
+            result['relative'] = result['value'] / baseline['value']
+        stream.write(format_result(name, result) + '\n')
+    return results
+
+
+def format_result(name, result):
+    if result['unit'] == 's':
+        value = '{0:12.3f} us'.format(result['value'] * 1e6)
+    else:
+        value = '{0:12.1f} {1}'.format(result['value'], result['unit'])
+    line = '{0:<40} {1}'.format(name, value)
+    if 'relative' in result:
+        line += '  {0:7.3g}x {1}'.format(result['relative'],
+                                          result['baseline'])
+    return line
+
+
+def compare(results, stored, threshold, relative=False):
+    key = 'relative' if relative else 'value'
+    regressions = []
+    for name, result in results.items():
+        old = stored.get(name)
+        if old is None or key not in result or key not in old:
+            continue
+        ratio = result[key] / old[key]
+        if ratio > threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark addict.')
+    parser.add_argument('patterns', nargs='*',
+                        help='only run benchmarks matching these globs')
+    parser.add_argument('-o', '--output',
+                        help='write results as JSON to this file')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare against results stored in FILE')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='fail when a benchmark is this many times '
+                             'slower than the stored result (default 1.25)')
+    parser.add_argument('--relative', action='store_true',
+                        help='compare the ratios to the plain dict/json '
+                             'baselines instead of absolute timings')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='seconds to spend timing each benchmark')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    load_benchmarks()
+    benchmarks = select(args.patterns)
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+
+    results = run(benchmarks, repeat=args.repeat, min_time=args.min_time)
+    if args.output:
+        document = OrderedDict([
+            ('addict', addict.__version__),
+            ('python', platform.python_version()),
+            ('implementation', platform.python_implementation()),
+            ('results', results),
+        ])
+        with open(args.output, 'w') as fp:
+            json.dump(document, fp, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            stored = json.load(fp)['results']
+        regressions = compare(results, stored, args.threshold, args.relative)
+        for name, ratio in regressions:
+            print('REGRESSION {0}: {1:.2f}x the stored result'.format(
+                name, ratio))
+        if regressions:
+            return 1
+    return 0
@@ -1,8 +1,33 @@
+import io
 import json
 import copy
+import functools
+import inspect
 import unittest
+import os
 import pickle
-from addict import Dict
+import sys
+import tempfile
+import threading
+from array import array
+from addict import (Aggregator, Collection, Dict, CompactDict, ConcurrentDict,
+                    FrozenDict, Merger, Profiler, ReadDict, SnapshotDict,
+                    apply_patch, checkpoint, compile_schema, convert_many,
+                    diff, from_columns, iter_json_lines, merge, open_snapshot,
+                    to_columns, to_dicts, track, untrack, write_snapshot)
+from addict.columns import _ARRAY_TYPECODES, numpy
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from addict import aiter_ndjson
+except ImportError:  # Python 2
+    asyncio = aiter_ndjson = None
+
+try:
+    from StringIO import StringIO  # Python 2, where json writes str
+except ImportError:
+    from io import StringIO
 
 
 # test whether unittests pass on child classes
@@ -15,6 +40,9 @@ class CHILD_CLASS(Dict):
 
 TEST_VAL = [1, 2, 3]
 TEST_DICT = {'a': {'b': {'c': TEST_VAL}}}
+SCHEMA_CLASS = compile_schema({'a': {'b': {'c': TEST_VAL}}, 'id': 1,
+                               'tags': [{'n': 1}, {'m': [1]}]},
+                              'SCHEMA_CLASS')
 
 
 class AbstractTestsClass(object):
@@ -209,6 +237,136 @@ class AbstractTestsClass(object):
             regular['a'][0].a = 1
         self.assertRaises(AttributeError, get_attr_deep)
 
+    def test_to_dict_with_nested_sequences(self):
+        nested = {'a': [({'b': 1}, [{'c': 2}])], 'd': ()}
+        prop = self.dict_class(nested)
+        self.assertIsInstance(prop.a[0][1][0], self.dict_class)
+        regular = prop.to_dict()
+        self.assertEqual(regular, nested)
+        self.assertIsInstance(regular['a'][0], tuple)
+        self.assertNotIsInstance(regular['a'][0][1][0], self.dict_class)
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 3
+        nested = {}
+        for _ in range(depth):
+            nested = {'a': nested, 'b': [()]}
+        prop = self.dict_class(nested)
+        prop.freeze()
+        regular = prop.to_dict()
+        for _ in range(depth):
+            self.assertIsInstance(prop, self.dict_class)
+            self.assertNotIsInstance(regular, self.dict_class)
+            self.assertEqual(regular['b'], [()])
+            with self.assertRaises(KeyError):
+                prop.missing
+            prop, regular = prop.a, regular['a']
+        self.assertEqual(regular, {})
+
+    def test_get_path(self):
+        prop = self.dict_class({'a': {'b': [{'c': 1}]}, 1: {'d': 2}})
+        self.assertEqual(prop.get_path('a.b.0.c'), 1)
+        self.assertEqual(prop.get_path(('a', 'b', 0, 'c')), 1)
+        self.assertEqual(prop.get_path(u'a.b.0.c'), 1)
+        self.assertEqual(prop.get_path([1, 'd']), 2)
+        self.assertIsInstance(prop.get_path('a.b.0'), self.dict_class)
+        self.assertIsNone(prop.get_path('a.x.y'))
+        self.assertEqual(prop.get_path('a.b.5.c', 'default'), 'default')
+        self.assertEqual(prop.get_path('a.b.0.c.d', 'default'), 'default')
+        self.assertEqual(prop, {'a': {'b': [{'c': 1}]}, 1: {'d': 2}})
+        with self.assertRaises(ValueError):
+            prop.get_path(())
+
+    def test_set_path(self):
+        prop = self.dict_class({'a': {'b': [{'c': 1}]}})
+        prop.set_path('a.b.0.c', 2)
+        prop.set_path('x.y.z', 3)
+        prop.set_path(('x', 1), 4)
+        prop.set_path(u'x.u', 5)
+        self.assertEqual(prop, {'a': {'b': [{'c': 2}]},
+                                'x': {'y': {'z': 3}, 1: 4, 'u': 5}})
+        self.assertIsInstance(prop.x.y, self.dict_class)
+        with self.assertRaises(TypeError):
+            prop.set_path('x.y.z.w', 5)
+        with self.assertRaises(IndexError):
+            prop.set_path('a.b.3.c', 5)
+
+    def test_get_many(self):
+        prop = self.dict_class({'a': {'b': 1, 'c': 2}, 'd': [3]})
+        self.assertEqual(prop.get_many(['a.b', 'a.c', 'a.x', 'd.0', 'y.z']),
+                         [1, 2, None, 3, None])
+        self.assertEqual(prop.get_many(['y.z'], default=0), [0])
+        self.assertNotIn('y', prop)
+
+    def test_set_many(self):
+        prop = self.dict_class()
+        prop.set_many(('a.b.k{0}'.format(i), i) for i in range(3))
+        prop.set_many({'a.b.k0': 'new', 'c': 1})
+        self.assertEqual(prop, {'a': {'b': {'k0': 'new', 'k1': 1, 'k2': 2}},
+                                'c': 1})
+        prop.set_many([('a.b', {}), ('a.b.k3', 3)])
+        self.assertEqual(prop.a, {'b': {'k3': 3}})
+
+    def test_from_json(self):
+        text = u'{"a": [{"b": 1}], "c": {"d": null}}'
+        for source in (text, text.encode('utf-8'), io.StringIO(text)):
+            prop = self.dict_class.from_json(source)
+            self.assertIsInstance(prop, self.dict_class)
+            self.assertIsInstance(prop.a[0], self.dict_class)
+            self.assertIsInstance(prop.c, self.dict_class)
+            self.assertEqual(prop, json.loads(text))
+        prop.c.e.f = 1
+        self.assertEqual(prop.c, {'d': None, 'e': {'f': 1}})
+
+    def test_to_json(self):
+        prop = self.dict_class({'a': ({'b': 1}, [2]), 'c': {}})
+        prop.d.e = None
+        self.assertEqual(prop.to_json(sort_keys=True),
+                         json.dumps(prop.to_dict(), sort_keys=True))
+
+    def test_dump(self):
+        prop = self.dict_class({'a': [{'b': i} for i in range(100)]})
+        expected = json.dumps(prop.to_dict())
+        out = StringIO()
+        prop.dump(out)
+        self.assertEqual(out.getvalue(), expected)
+
+        class Socket(object):
+            def __init__(self):
+                self.chunks = []
+
+            def sendall(self, data):
+                self.chunks.append(data)
+
+        sock = Socket()
+        prop.dump(sock, chunk_size=64, encoding='utf-8')
+        self.assertGreater(len(sock.chunks), 1)
+        self.assertEqual(b''.join(sock.chunks), expected.encode('utf-8'))
+        sock = Socket()
+        prop.dump(sock)
+        self.assertEqual(b''.join(sock.chunks), expected.encode('utf-8'))
+        self.assertIsInstance(sock.chunks[0], bytes)
+
+    def test_dump_with_encoder_class(self):
+        class SetEncoder(json.JSONEncoder):
+            def default(self, o):
+                if isinstance(o, set):
+                    return sorted(o)
+                return json.JSONEncoder.default(self, o)
+
+        prop = self.dict_class({'a': {'b': set([2, 1])}})
+        for chunk_size in (None, 4):
+            out = StringIO()
+            prop.dump(out, chunk_size=chunk_size, cls=SetEncoder)
+            self.assertEqual(json.loads(out.getvalue()), {'a': {'b': [1, 2]}})
+
+    def test_iter_json_lines(self):
+        lines = io.BytesIO(b'{"a": {"b": 1}}\n\n[{"c": 2}]\n3\n')
+        records = list(iter_json_lines(lines, self.dict_class))
+        self.assertEqual(records, [{'a': {'b': 1}}, [{'c': 2}], 3])
+        self.assertIsInstance(records[0].a, self.dict_class)
+        self.assertIsInstance(records[1][0], self.dict_class)
+
     def test_to_dict_with_tuple(self):
         nested = {'a': ({'a': 0}, {2: 0})}
         prop = self.dict_class(nested)
@@ -267,7 +425,16 @@ class AbstractTestsClass(object):
             org.update({'a': 2}, {'a': 1})
         org = self.dict_class()
         self.assertRaises(TypeError, update)
-        
+
+    def test_update_deep_pairs_and_plain_children(self):
+        org = self.dict_class()
+        org.a.b.c = 1
+        org.plain = {'x': {'y': 1}}
+        org.update([('a', {'b': {'d': 2}}), ('plain', {'x': {'z': 2}})])
+        self.assertEqual(org.a.b, {'c': 1, 'd': 2})
+        # plain dicts are updated by dict.update, one level only
+        self.assertEqual(org.plain, {'x': {'z': 2}})
+
     def test_ior_operator(self):
         old = self.dict_class()
         old.child.a = 'a'
@@ -449,6 +616,36 @@ class AbstractTestsClass(object):
     def test_pickle(self):
         a = self.dict_class(TEST_DICT)
         self.assertEqual(a, pickle.loads(pickle.dumps(a)))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(a, protocol))
+            self.assertIs(type(restored.a.b), self.dict_class)
+            restored.x.y = 1
+            self.assertEqual(restored.x, {'y': 1})
+
+    def test_pickle_keeps_frozen_state(self):
+        a = self.dict_class(TEST_DICT)
+        a.freeze()
+        restored = pickle.loads(pickle.dumps(a))
+        self.assertEqual(restored, a)
+        with self.assertRaises(KeyError):
+            restored.a.missing = 1
+        restored.a.b.c = 'overwritten'
+        self.assertEqual(a.a.b.c, TEST_VAL)
+        self.assertFalse(object.__getattribute__(a.copy(), '_Dict__frozen'))
+
+    @unittest.skipIf(pickle.HIGHEST_PROTOCOL < 5, 'needs pickle protocol 5')
+    def test_pickle_out_of_band_buffers(self):
+        big = b'x' * (1 << 16)
+        a = self.dict_class({'blob': big, 'writable': bytearray(big),
+                             'small': b'y', 'nested': {'blob': big}})
+        buffers = []
+        data = pickle.dumps(a, 5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 3)
+        self.assertLess(len(data), len(big))
+        restored = pickle.loads(data, buffers=buffers)
+        self.assertEqual(restored, a)
+        self.assertIs(type(restored.nested.blob), bytes)
+        self.assertEqual(pickle.loads(pickle.dumps(a, 5)), a)
 
     def test_add_on_empty_dict(self):
         d = self.dict_class()
@@ -575,16 +772,1245 @@ class AbstractTestsClass(object):
 class DictTests(unittest.TestCase, AbstractTestsClass):
     dict_class = Dict
 
+    def test_overridden_init_and_to_dict_apply_per_node(self):
+        class Lower(Dict):
+            def __init__(self, *args, **kwargs):
+                items = dict(*args, **kwargs)
+                super(Lower, self).__init__(
+                    (key.lower(), value) for key, value in items.items())
+
+        class Tagged(Dict):
+            def to_dict(self):
+                base = super(Tagged, self).to_dict()
+                base['tag'] = True
+                return base
+
+        lowered = Lower({'A': {'B': 1, 'C': [{'D': 2}]}})
+        self.assertEqual(lowered, {'a': {'b': 1, 'c': [{'d': 2}]}})
+        self.assertIsInstance(lowered.a, Lower)
+        tagged = Tagged({'a': {'b': [{'c': 1}]}})
+        self.assertEqual(tagged.to_dict(),
+                         {'a': {'b': [{'c': 1, 'tag': True}], 'tag': True},
+                          'tag': True})
+
+    def test_circular_reference(self):
+        looped = {'a': {}}
+        looped['a']['b'] = [looped]
+        with self.assertRaises(ValueError):
+            Dict(looped)
+        prop = Dict()
+        prop.x.me = prop
+        with self.assertRaises(ValueError):
+            prop.to_dict()
+        prop.freeze()
+        with self.assertRaises(KeyError):
+            prop.x.missing
+        shared = {'b': {'c': 1}}
+        prop = Dict({'a': shared, 'd': [shared, (shared,)]})
+        self.assertEqual(prop.to_dict(), {'a': shared,
+                                          'd': [shared, (shared,)]})
+        self.assertIsNot(prop.a, prop.d[0])
+
 
 class ChildDictTests(unittest.TestCase, AbstractTestsClass):
     dict_class = CHILD_CLASS
 
+
+class InternedDictTests(unittest.TestCase, AbstractTestsClass):
+    dict_class = Dict.interned_class()
+
+    def test_keys_are_shared(self):
+        lines = [json.dumps({'first' + 'key': {'second' + 'key': i}})
+                 for i in range(2)]
+        for dict_class in (self.dict_class, CompactDict.interned_class()):
+            first, second = iter_json_lines(lines, dict_class=dict_class)
+            self.assertIs(list(first)[0], list(second)[0])
+            self.assertIs(list(first.firstkey)[0], list(second.firstkey)[0])
+            self.assertIsInstance(second.firstkey, dict_class)
+            built = dict_class(json.loads(lines[0]))
+            self.assertIs(list(built)[0], list(first)[0])
+        plain = list(iter_json_lines(lines))
+        self.assertIsNot(list(plain[0])[0], list(plain[1])[0])
+
+    def test_interned_class(self):
+        interned = self.dict_class
+        self.assertIs(Dict.interned_class(), interned)
+        self.assertIs(interned.interned_class(), interned)
+        self.assertEqual(CompactDict.interned_class().__dictoffset__, 0)
+        restored = pickle.loads(pickle.dumps(interned(a={'b': 1})))
+        self.assertIs(type(restored.a), interned)
+
+
+class ProbingDictTests(unittest.TestCase, AbstractTestsClass):
+    dict_class = Dict.probing_class()
+
+    def test_probes_do_not_vivify(self):
+        prop = self.dict_class({'a': {'b': 1}, '_c': 2})
+        self.assertFalse(hasattr(prop, '__html__'))
+        self.assertIsNone(getattr(prop, '_asdict', None))
+        self.assertFalse(hasattr(prop, '__wrapped__'))
+        if hasattr(inspect, 'unwrap'):  # Python 3
+            self.assertIs(inspect.unwrap(prop), prop)
+        self.assertEqual(prop._c, 2)
+        self.assertIsInstance(prop['_d'], self.dict_class)
+        prop.e.f = 1
+        self.assertEqual(prop, {'a': {'b': 1}, '_c': 2, 'e': {'f': 1}})
+        self.assertIsInstance(prop.a, self.dict_class)
+        with self.assertRaises(AttributeError):
+            prop._d.g = 1
+
+    def test_names(self):
+        dunder = Dict.probing_class('dunder')
+        self.assertFalse(hasattr(dunder(), '__html__'))
+        self.assertIsInstance(dunder()._asdict, dunder)
+        everything = CompactDict.probing_class('all')
+        self.assertIsNone(getattr(everything(), 'isoformat', None))
+        self.assertEqual(everything(a=1).a, 1)
+        self.assertEqual(everything.__dictoffset__, 0)
+        self.assertIs(dunder.probing_class('all'),
+                      Dict.probing_class('all'))
+        self.assertIs(Dict.probing_class(), self.dict_class)
+        with self.assertRaises(ValueError):
+            Dict.probing_class('public')
+
+    def test_pickle_and_lazy(self):
+        restored = pickle.loads(pickle.dumps(self.dict_class(a={'b': 1})))
+        self.assertIs(type(restored.a), self.dict_class)
+        self.assertFalse(hasattr(restored, '__html__'))
+        lazy = self.dict_class.lazy({'a': {'b': 1}})
+        self.assertFalse(hasattr(lazy, '__html__'))
+        self.assertEqual(lazy.a.b, 1)
+
+
+class SchemaDictTests(unittest.TestCase):
+
+    def test_schema_classes(self):
+        doc = SCHEMA_CLASS({'a': {'b': {'c': 1}}, 'id': 2,
+                            'tags': [{'n': 3}, {'m': [{'x': 1}]}, 4],
+                            'extra': {'y': {'z': 1}}})
+        a_class = type(doc.a)
+        self.assertIsNot(a_class, SCHEMA_CLASS)
+        self.assertIsInstance(doc.a, Dict)
+        self.assertIs(type(doc.tags[0]), type(doc.tags[1]))
+        self.assertIs(type(doc.tags[1].m[0]), Dict)
+        self.assertIs(type(doc.extra.y), Dict)
+        self.assertIs(type(doc.missing), Dict)
+        self.assertIs(type(SCHEMA_CLASS().a), a_class)
+        self.assertIs(type(SCHEMA_CLASS().a.b), type(doc.a.b))
+        self.assertIsInstance(SCHEMA_CLASS.__dict__['id'], property)
+        plain = doc.to_dict()
+        self.assertEqual(plain['tags'][2], 4)
+        self.assertIs(type(plain['a']['b']), dict)
+        self.assertIs(type(plain['tags'][1]['m'][0]), dict)
+        self.assertIs(type(plain['extra']['y']), dict)
+
+    def test_values_outside_the_schema(self):
+        doc = SCHEMA_CLASS({'id': {'nested': [{'k': 1}]}, 'a': [{'b': 1}],
+                            'tags': ({'n': 1},)})
+        self.assertIs(type(doc.id), Dict)
+        self.assertIs(type(doc.id.nested[0]), Dict)
+        self.assertIs(type(doc.a[0]), type(SCHEMA_CLASS().a))
+        self.assertIsInstance(doc.tags, tuple)
+        inner = Dict({'b': {'c': 2}})
+        doc = SCHEMA_CLASS(a=inner)
+        self.assertIsNot(doc.a, inner)
+        self.assertIs(type(doc.a.b), type(SCHEMA_CLASS().a.b))
+
+    def test_write_update_and_json(self):
+        doc = SCHEMA_CLASS()
+        doc.id = 5
+        doc.a.b.c = 1
+        doc.update({'a': {'b': {'d': 2}}, 'id': 6})
+        self.assertEqual(doc, {'a': {'b': {'c': 1, 'd': 2}}, 'id': 6})
+        with self.assertRaises(AttributeError):
+            doc.items = 1
+        parsed = SCHEMA_CLASS.from_json(json.dumps(doc))
+        self.assertEqual(parsed, doc)
+        self.assertIs(type(parsed.a.b), type(doc.a.b))
+        self.assertEqual(SCHEMA_CLASS.from_json('[{"a": {}}]')[0].a, {})
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(doc, protocol))
+            self.assertEqual(loaded, doc)
+            self.assertIs(type(loaded.a.b), type(doc.a.b))
+        doc.freeze()
+        with self.assertRaises(KeyError):
+            doc.a.missing
+        loaded = pickle.loads(pickle.dumps(doc))
+        with self.assertRaises(KeyError):
+            loaded.a.missing
+
+    def test_typed_dict(self):
+        try:
+            from typing import List, Optional, TypedDict
+        except ImportError:
+            self.skipTest('needs typing.TypedDict')
+        user = TypedDict('User', {'id': int, 'region': str})
+        event = TypedDict('Event', {'user': user, 'tags': List[user],
+                                    'parent': Optional[user], 'score': float})
+        event_class = compile_schema(event, 'Event')
+        self.assertEqual(sorted(event_class._schema_children),
+                         ['parent', 'tags', 'user'])
+        doc = event_class({'user': {'id': 1}, 'score': 1.5})
+        self.assertIs(type(doc.user), event_class._schema_children['user'])
+        self.assertIsInstance(event_class.__dict__['score'], property)
+
+
+class LazyDictTests(unittest.TestCase, AbstractTestsClass):
+    dict_class = type(Dict.lazy())
+
+    def test_lazy_keeps_payload(self):
+        payload = {'a': {'b': [{'c': 1}]}, 'd': 2}
+        prop = Dict.lazy(payload)
+        self.assertIs(dict.__getitem__(prop, 'a'), payload['a'])
+        self.assertIsInstance(prop.a, Dict)
+        self.assertIs(prop.a, prop['a'])
+        self.assertEqual(prop.a.b[0].c, 1)
+        self.assertEqual(payload, {'a': {'b': [{'c': 1}]}, 'd': 2})
+
+    def test_lazy_assignment_is_not_wrapped(self):
+        prop = Dict.lazy()
+        value = {'a': 1}
+        prop.x = value
+        self.assertIs(prop.x, value)
+
+    def test_lazy_child_class(self):
+        prop = CHILD_CLASS.lazy({'a': {'b': 1}})
+        self.assertIsInstance(prop.a, CHILD_CLASS)
+        self.assertEqual(prop.a.child_class_attribute,
+                         'child class attribute')
+
+    def test_lazy_to_dict_and_pickle(self):
+        payload = {'a': {'b': ({'c': 1},)}}
+        prop = Dict.lazy(payload)
+        self.assertEqual(prop.to_dict(), payload)
+        self.assertIsNot(prop.to_dict()['a'], payload['a'])
+        restored = pickle.loads(pickle.dumps(prop))
+        self.assertEqual(restored, payload)
+        self.assertIs(type(restored), type(prop))
+
+    @unittest.skipIf(sys.version_info[0] < 3,
+                     'dict() copies the raw items of a dict on Python 2')
+    def test_lazy_dict(self):
+        payload = {'a': {'b': 1}, 'c': [{'d': 2}]}
+        prop = Dict.lazy(payload)
+        self.assertIsInstance(dict(prop)['a'], Dict)
+        self.assertIsInstance(dict(prop)['c'][0], Dict)
+
+    def test_lazy_pop(self):
+        payload = {'a': {'b': 1}, 'c': {'d': 2}, 'e': {'f': 3}}
+        prop = Dict.lazy(payload)
+        self.assertIsInstance(prop.pop('a'), Dict)
+        self.assertEqual(prop.pop('a', None), None)
+        prop.c.g = 1
+        name, value = prop.popitem()
+        self.assertIsInstance(value, Dict)
+        self.assertIsInstance(prop.popitem()[1], Dict)
+        self.assertEqual(prop, {})
+        self.assertEqual(payload, {'a': {'b': 1}, 'c': {'d': 2},
+                                   'e': {'f': 3}})
+
+
+class CompactDictTests(unittest.TestCase, AbstractTestsClass):
+    dict_class = CompactDict
+
+    def test_no_instance_dict(self):
+        prop = CompactDict({'a': {'b': 1}})
+        prop.x.y = 1
+        prop.freeze()
+        for value in (prop, prop.a, prop.x):
+            with self.assertRaises(AttributeError):
+                object.__getattribute__(value, '__dict__')
+
+    def test_freeze_nested_in_dict(self):
+        prop = Dict()
+        prop.inner = CompactDict({'a': 1})
+        prop.freeze()
+        with self.assertRaises(KeyError):
+            prop.inner.missing
+
+
+class LazyCopyTests(unittest.TestCase):
+
+    def template(self):
+        return Dict({'db': {'host': 'a', 'ports': [1, 2]},
+                     'cache': {'ttl': 10, 'hosts': [{'name': 'c'}]}})
+
+    def test_leaves_the_original_alone(self):
+        template = self.template()
+        db = template.db
+        copied = template.lazy_copy()
+        copied.db.host = 'b'
+        self.assertIs(type(template), Dict)
+        template.lazy_copy()
+        self.assertIs(template.db, db)
+        self.assertNotIsInstance(dict.__getitem__(copied, 'cache'), Dict)
+        self.assertEqual(copied.db.host, 'b')
+        self.assertEqual(template.db.host, 'a')
+
+    def test_held_references_do_not_leak(self):
+        template = self.template()
+        db = template.db
+        hosts = template.cache.hosts
+        copied = template.lazy_copy()
+        db.host = 'leaked'
+        hosts[0].name = 'leaked'
+        hosts.append({'name': 'd'})
+        self.assertEqual(copied.db.host, 'a')
+        self.assertEqual(copied.cache.hosts, [{'name': 'c'}])
+        copied.db.ports.append(3)
+        self.assertEqual(db.ports, [1, 2])
+
+    def test_writes_to_either_side_are_isolated(self):
+        template = self.template()
+        first = template.lazy_copy()
+        second = template.lazy_copy()
+        first.cache.hosts[0].name = 'first'
+        first.db.ports.append(3)
+        template.cache.hosts[0].name = 'template'
+        template.db.new.key = 1
+        second.cache.ttl = 20
+        self.assertEqual(first.cache.hosts[0].name, 'first')
+        self.assertEqual(second.cache.hosts[0].name, 'c')
+        self.assertEqual(template.cache.hosts[0].name, 'template')
+        self.assertEqual(first.db.ports, [1, 2, 3])
+        self.assertEqual(template.db.ports, [1, 2])
+        self.assertEqual(second.db, {'host': 'a', 'ports': [1, 2]})
+        self.assertEqual(template.db.new, {'key': 1})
+        self.assertEqual(template.cache.ttl, 10)
+
+    def test_stays_a_dict(self):
+        template = CHILD_CLASS({'a': {'b': 1}})
+        copied = template.lazy_copy()
+        for prop in (template, copied, template.a, copied.a):
+            self.assertIsInstance(prop, CHILD_CLASS)
+        self.assertEqual(copied.to_dict(), {'a': {'b': 1}})
+        self.assertEqual(pickle.loads(pickle.dumps(copied)), copied)
+
+
+class FrozenDictTests(unittest.TestCase):
+
+    def test_snapshot(self):
+        prop = Dict(TEST_DICT)
+        prop.x.y = {'z': [{'w': 1}]}
+        frozen = FrozenDict(prop)
+        self.assertEqual(frozen.a.b.c, tuple(TEST_VAL))
+        self.assertIsInstance(frozen.x.y, FrozenDict)
+        self.assertIsInstance(frozen.x.y.z[0], FrozenDict)
+        prop.x.y['z'][0]['w'] = 2
+        self.assertEqual(frozen.x.y.z[0].w, 1)
+        self.assertIs(FrozenDict(frozen), frozen)
+
+    def test_circular_reference(self):
+        looped = {'a': [{}]}
+        looped['a'][0]['b'] = looped
+        with self.assertRaises(ValueError):
+            FrozenDict(looped)
+        shared = {'b': {'c': 1}}
+        frozen = FrozenDict({'a': shared, 'd': [shared]})
+        self.assertEqual(frozen.d, ({'b': {'c': 1}},))
+
+    def test_immutable(self):
+        frozen = FrozenDict({'a': {'b': 1}})
+        with self.assertRaises(TypeError):
+            frozen.a.b = 2
+        with self.assertRaises(TypeError):
+            frozen['c'] = 2
+        with self.assertRaises(TypeError):
+            frozen.update(c=2)
+        with self.assertRaises(TypeError):
+            del frozen.a
+        with self.assertRaises(AttributeError):
+            frozen.missing
+        self.assertFalse(hasattr(frozen, 'missing'))
+        self.assertEqual(frozen, {'a': {'b': 1}})
+
+    def test_hash_and_equality(self):
+        first = FrozenDict(Dict(TEST_DICT))
+        second = FrozenDict(TEST_DICT)
+        third = FrozenDict({'a': {'b': {'c': [1, 2]}}})
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertEqual(len(set([first, second, third])), 2)
+
+    @unittest.skipIf(not hasattr(functools, 'lru_cache'),
+                     'needs functools.lru_cache')
+    def test_lru_cache_key(self):
+        first = FrozenDict(Dict(TEST_DICT))
+        second = FrozenDict(TEST_DICT)
+
+        @functools.lru_cache()
+        def size(config):
+            return len(config.a.b.c)
+        self.assertEqual(size(first), 3)
+        self.assertEqual(size(second), 3)
+        self.assertEqual(size.cache_info().hits, 1)
+
+    def test_copy_pickle_and_conversion(self):
+        frozen = FrozenDict({'a': [{'b': set([1])}]})
+        self.assertIs(copy.copy(frozen), frozen)
+        self.assertIs(copy.deepcopy(frozen), frozen)
+        restored = pickle.loads(pickle.dumps(frozen))
+        self.assertEqual(restored, frozen)
+        self.assertIsInstance(restored.a[0], FrozenDict)
+        regular = frozen.to_dict()
+        self.assertEqual(regular, {'a': ({'b': frozenset([1])},)})
+        self.assertNotIsInstance(regular['a'][0], FrozenDict)
+        thawed = frozen.thaw()
+        self.assertIsInstance(thawed.a[0], Dict)
+        thawed.a[0].c = 1
+        self.assertNotIn('c', frozen.a[0])
+
+
+class ColumnsTests(unittest.TestCase):
+
+    def records(self):
+        return [Dict({'id': 1, 'user': {'region': 'eu', 'score': 0.5}}),
+                {'id': 2, 'user': {'region': 'us', 'score': 2}},
+                Dict({'id': 3})]
+
+    def test_to_columns_array(self):
+        records = self.records()
+        columns = to_columns(records, ['id', 'user.score', 'user.region'],
+                             fill=float('nan'), backend='array')
+        self.assertIsInstance(columns['id'], array)
+        self.assertIn(columns['id'].typecode, _ARRAY_TYPECODES['int'])
+        self.assertEqual(columns['id'].tolist(), [1, 2, 3])
+        self.assertEqual(columns['user.score'][:2], array('d', [0.5, 2.0]))
+        self.assertNotEqual(columns['user.score'][2],
+                            columns['user.score'][2])
+        self.assertEqual(columns['user.region'][:2], ['eu', 'us'])
+        self.assertEqual(records[2], {'id': 3})
+
+    def test_to_columns_array_typecode_fallback(self):
+        # Python 2 raises ValueError for the 'q' typecode
+        saved = _ARRAY_TYPECODES['int']
+        _ARRAY_TYPECODES['int'] = ('!',) + saved[1:]
+        try:
+            columns = to_columns(self.records(), ['id'], backend='array')
+        finally:
+            _ARRAY_TYPECODES['int'] = saved
+        self.assertEqual(columns['id'], array('l', [1, 2, 3]))
+
+    def test_to_columns_list_and_fill(self):
+        columns = to_columns(self.records(), ['id', 'user.region', 'x.y'],
+                             fill='', backend='list')
+        self.assertEqual(columns, {'id': [1, 2, 3], 'x.y': ['', '', ''],
+                                   'user.region': ['eu', 'us', '']})
+        with self.assertRaises(ValueError):
+            to_columns([], ['id'], backend='pandas')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_to_columns_numpy(self):
+        columns = to_columns(self.records(), ['id', 'user.region'],
+                             backend='numpy')
+        self.assertEqual(columns['id'].dtype, numpy.int64)
+        self.assertEqual(columns['user.region'].tolist(), ['eu', 'us', None])
+        columns = to_columns([{'id': 2 ** 64}, {'id': 1}], ['id'],
+                             backend='numpy')
+        self.assertEqual(columns['id'].dtype, object)
+        self.assertEqual(columns['id'].tolist(), [2 ** 64, 1])
+
+    def test_to_columns_big_ints(self):
+        columns = to_columns([{'id': 2 ** 64}, {'id': 1}], ['id'],
+                             backend='array')
+        self.assertEqual(columns['id'], [2 ** 64, 1])
+
+    def test_from_columns(self):
+        columns = to_columns(self.records(), ['id', 'user.score'],
+                             fill=float('nan'), backend='array')
+        records = from_columns(columns, fill=float('nan'))
+        self.assertEqual(records, [{'id': 1, 'user': {'score': 0.5}},
+                                   {'id': 2, 'user': {'score': 2.0}},
+                                   {'id': 3}])
+        self.assertIsInstance(records[0].user, Dict)
+        records = from_columns({'a.b': [1, None]}, dict_class=CHILD_CLASS)
+        self.assertEqual(records, [{'a': {'b': 1}}, {'a': {'b': None}}])
+        self.assertIsInstance(records[0].a, CHILD_CLASS)
+
+
+class AggregatorTests(unittest.TestCase):
+    rows = [
+        {'born': 1980, 'gender': 'M', 'eyes': 'green', 'height': 180},
+        {'born': 1980, 'gender': 'F', 'eyes': 'green', 'height': 165},
+        {'born': 1980, 'gender': 'M', 'eyes': 'green', 'height': 190},
+        {'born': 1981, 'gender': 'M', 'eyes': 'blue', 'height': 175},
+        {'born': 1981, 'gender': 'F', 'eyes': 'blue'},
+    ]
+
+    def test_counts_like_nested_dict(self):
+        counter = Dict()
+        for row in self.rows:
+            counter[row['born']][row['gender']][row['eyes']] += 1
+        aggregator = Aggregator().add_many(
+            self.rows, keys=('born', 'gender', 'eyes'))
+        self.assertEqual(aggregator.to_dict(), counter)
+        self.assertIsInstance(aggregator.to_dict()[1980], Dict)
+        self.assertEqual(aggregator.get((1980, 'M', 'green')), 2)
+        self.assertEqual(len(aggregator), 4)
+
+    def test_key_tuples_and_paths(self):
+        aggregator = Aggregator()
+        aggregator.add_many([('a', 1), ('a', 1), ('b', 2)])
+        aggregator.add(['a', 1])
+        self.assertEqual(aggregator.to_dict(), {'a': {1: 3}, 'b': {2: 1}})
+        nested = Aggregator(keys=['user.region']).add_many(
+            [Dict(user={'region': 'eu'}), {'user': {}}, {}])
+        self.assertEqual(nested.to_dict(), {'eu': 1, None: 2})
+        flat = Aggregator(keys=['gender']).add_many(
+            [{'gender': 'M'}, Dict(gender='M'), Dict(), {}])
+        self.assertEqual(flat.to_dict(), {'M': 2, None: 2})
+        with self.assertRaises(ValueError):
+            Aggregator().add_many([('a',)], value='height')
+
+    def test_value_stats(self):
+        aggregator = Aggregator(keys=('gender',), value='height')
+        aggregator.add_many(self.rows)
+        self.assertEqual(aggregator.to_dict(), {'M': 3, 'F': 2})
+        self.assertEqual(aggregator.to_dict('sum'), {'M': 545, 'F': 165})
+        self.assertEqual(aggregator.to_dict('min'), {'M': 175, 'F': 165})
+        self.assertEqual(aggregator.to_dict('max'), {'M': 190, 'F': 165})
+        self.assertEqual(aggregator.get(('M',), 'mean'), 545 / 3.0)
+        self.assertIsNone(aggregator.get(('X',), 'mean'))
+        with self.assertRaises(ValueError):
+            aggregator.to_dict('median')
+
+    def test_merge_partial_results(self):
+        keys = ('born', 'gender')
+        whole = Aggregator(keys, 'height').add_many(self.rows)
+        first = Aggregator(keys, 'height').add_many(self.rows[:2])
+        second = Aggregator(keys, 'height').add_many(self.rows[2:])
+        merged = Aggregator(keys, 'height').merge(
+            first, pickle.loads(pickle.dumps(second)))
+        for stat in Aggregator.STATS:
+            self.assertEqual(dict(merged.items(stat)),
+                             dict(whole.items(stat)))
+
+
+class ParallelTests(unittest.TestCase):
+    docs = [{'id': i, 'user': {'tags': [{'n': i}]}} for i in range(25)]
+
+    def test_convert_many(self):
+        for workers in (1, 2):
+            converted = convert_many(self.docs, workers=workers,
+                                     chunk_size=4)
+            self.assertEqual(converted, self.docs)
+            self.assertIsInstance(converted[3].user.tags[0], Dict)
+        parsed = convert_many((json.dumps(doc) for doc in self.docs),
+                              workers=2, dict_class=ReadDict)
+        self.assertEqual(parsed, self.docs)
+        self.assertIsInstance(parsed[0].user, ReadDict)
+
+    def test_to_dicts(self):
+        dicts = [Dict(doc) for doc in self.docs]
+        plain = to_dicts(dicts, workers=2, chunk_size=7)
+        self.assertEqual(plain, self.docs)
+        self.assertIs(type(plain[10]['user']['tags'][0]), dict)
+        self.assertEqual(to_dicts([], workers=1), [])
+        with self.assertRaises(ValueError):
+            to_dicts(dicts, workers=1, chunk_size=0)
+
+
+class ConcurrentDictTests(unittest.TestCase):
+
+    def _threads(self, work, count=4):
+        # switch threads as often as possible, to make races likely
+        if hasattr(sys, 'getswitchinterval'):
+            interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+            restore = sys.setswitchinterval
+        else:  # Python 2
+            interval = sys.getcheckinterval()
+            sys.setcheckinterval(1)
+            restore = sys.setcheckinterval
+        try:
+            threads = [threading.Thread(target=work, args=(number,))
+                       for number in range(count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            restore(interval)
+
+    def test_concurrent_vivification(self):
+        tree = ConcurrentDict()
+
+        def work(number):
+            for key in range(500):
+                tree[key].a.b[number] = key
+        self._threads(work)
+        self.assertEqual(len(tree), 500)
+        for key in range(500):
+            self.assertEqual(tree[key].a.b, dict.fromkeys(range(4), key))
+            self.assertIsInstance(tree[key].a, ConcurrentDict)
+
+    def test_shared_detached_handles(self):
+        # every thread writes through the same detached handles, so they
+        # race to attach each of them
+        trees = [ConcurrentDict() for _ in range(5000)]
+        handles = [tree.shared for tree in trees]
+        errors = []
+        start = threading.Event()
+
+        def work(number):
+            start.wait()
+            try:
+                for handle in handles:
+                    handle['k{0}'.format(number % 2)].v[number] = number
+            except Exception as error:
+                errors.append(error)
+        threading.Timer(0.05, start.set).start()
+        self._threads(work)
+        self.assertEqual(errors, [])
+        for tree in trees:
+            self.assertEqual(tree, {'shared': {'k0': {'v': {0: 0, 2: 2}},
+                                               'k1': {'v': {1: 1, 3: 3}}}})
+
+    def test_atomic_operations(self):
+        tree = ConcurrentDict()
+
+        def work(number):
+            for _ in range(1000):
+                tree.increment('counters.hits')
+                tree.counters.increment(('by_thread', number), 2)
+            tree.setdefault_path('owners.first', number)
+        self._threads(work)
+        self.assertEqual(tree.counters.hits, 4000)
+        self.assertEqual(tree.counters.by_thread, dict.fromkeys(range(4),
+                                                                2000))
+        self.assertIn(tree.owners.first, range(4))
+        self.assertEqual(tree.increment('counters.hits', -4000), 0)
+        self.assertIs(tree.setdefault('owners', None), tree.owners)
+        with self.assertRaises(TypeError):
+            tree.increment('counters.hits.deeper')
+
+    def test_lost_race(self):
+        tree = ConcurrentDict()
+        first = tree.a
+        second = tree.a
+        first.b = 1
+        second.c.d = 2
+        second.e = 3
+        self.assertEqual(tree, {'a': {'b': 1, 'c': {'d': 2}, 'e': 3}})
+        self.assertEqual(second, tree.a)
+        self.assertEqual(second.b, 1)
+        self.assertIsInstance(second, ConcurrentDict)
+        self.assertEqual(len(second), 3)
+        detached = tree.x
+        self.assertEqual(detached.increment('y'), 1)
+        self.assertEqual(tree.x.setdefault('z', 2), 2)
+        self.assertEqual(tree.x, {'y': 1, 'z': 2})
+
+
+class _Reader(object):
+    # stands in for an asyncio.StreamReader, handing out at most `size`
+    # characters per read
+
+    def __init__(self, loop, data, size):
+        self.loop = loop
+        self.data = data
+        self.size = size
+
+    def read(self, n):
+        n = min(n, self.size)
+        chunk, self.data = self.data[:n], self.data[n:]
+        future = self.loop.create_future()
+        future.set_result(chunk)
+        return future
+
+
+@unittest.skipIf(asyncio is None, 'needs asyncio')
+class AsyncStreamTests(unittest.TestCase):
+    doc = {'a': {'b': [{'c': 1}, 2]}, 'text': u'\xe6\xf8\xe5'}
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def _reader(self, data, size=5):
+        return _Reader(self.loop, data, size)
+
+    def _collect(self, records):
+        items = []
+        while True:
+            try:
+                items.append(self.loop.run_until_complete(
+                    records.__anext__()))
+            except StopAsyncIteration:
+                return items
+
+    def test_afrom_stream(self):
+        data = json.dumps(self.doc).encode('utf-8')
+        built = self.loop.run_until_complete(
+            Dict.afrom_stream(self._reader(data), chunk_size=3))
+        self.assertEqual(built, self.doc)
+        self.assertIsInstance(built.a.b[0], Dict)
+        compact = self.loop.run_until_complete(
+            CompactDict.afrom_stream(self._reader(json.dumps(self.doc))))
+        self.assertIsInstance(compact.a, CompactDict)
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(Dict.afrom_stream(self._reader('')))
+
+    def test_yields_to_loop(self):
+        ticks = []
+
+        def tick():
+            ticks.append(1)
+            if len(ticks) < 1000:
+                self.loop.call_soon(tick)
+        self.loop.call_soon(tick)
+        data = json.dumps(self.doc)
+        self.loop.run_until_complete(
+            Dict.afrom_stream(self._reader(data, size=1)))
+        self.assertGreaterEqual(len(ticks), len(data))
+
+    def test_offload(self):
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        data = json.dumps(self.doc)
+        built = self.loop.run_until_complete(Dict.afrom_stream(
+            self._reader(data), offload_size=10, executor=executor))
+        self.assertEqual(built, self.doc)
+        self.assertIsInstance(built.a, Dict)
+        records = aiter_ndjson(self._reader(data + '\n{}'),
+                               offload_size=0, dict_class=ReadDict)
+        self.assertEqual(self._collect(records), [self.doc, {}])
+
+    def test_aiter_ndjson(self):
+        lines = [json.dumps(dict(self.doc, n=n)) for n in range(5)]
+        text = '\n'.join(lines[:2]) + '\n\n  \n' + '\n'.join(lines[2:])
+        for data in (text, text.encode('utf-8') + b'\n'):
+            for size in (1, 7, 1 << 16):
+                records = self._collect(aiter_ndjson(
+                    self._reader(data, size), dict_class=ReadDict))
+                self.assertEqual([record.n for record in records],
+                                 list(range(5)))
+                self.assertEqual(records[4].text, self.doc['text'])
+                self.assertIsInstance(records[1].a, ReadDict)
+        self.assertEqual(self._collect(aiter_ndjson(self._reader(b''))), [])
+
+
+class CollectionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{'id': i, 'user': {'region': ('eu', 'us')[i % 2]},
+                         'score': i % 5} for i in range(10)]
+        self.collection = Collection(self.records, indexes=['user.region'],
+                                     sorted_indexes=['score'])
+
+    def ids(self, records):
+        return [record.id for record in records]
+
+    def test_find(self):
+        collection = self.collection
+        self.assertEqual(len(collection), 10)
+        self.assertIsInstance(next(iter(collection)), Dict)
+        self.assertEqual(self.ids(collection.find({'user.region': 'eu'})),
+                         [0, 2, 4, 6, 8])
+        self.assertEqual(self.ids(collection.find({'user.region': 'us'},
+                                                  score=3)), [3])
+        self.assertEqual(self.ids(collection.find(id=7)), [7])
+        self.assertEqual(collection.find({('user', 'region'): 'apac'}), [])
+        self.assertEqual(len(collection.find()), 10)
+
+    def test_range(self):
+        collection = self.collection
+        self.assertEqual(self.ids(collection.range('score', 1, 2)),
+                         [1, 6, 2, 7])
+        self.assertEqual(self.ids(collection.range('score', high=0)), [0, 5])
+        self.assertEqual(self.ids(collection.range('id', 8)), [8, 9])
+
+    def test_writes_are_reindexed(self):
+        collection = self.collection
+        record = collection.find(id=3)[0]
+        record.user.region = 'eu'
+        self.assertEqual(self.ids(collection.find({'user.region': 'eu'})),
+                         [0, 2, 3, 4, 6, 8])
+        record.update({'user': {'region': 'apac'}, 'score': 9})
+        self.assertEqual(self.ids(collection.find({'user.region': 'apac'})),
+                         [3])
+        self.assertEqual(self.ids(collection.range('score', 5)), [3])
+        record.user = {'region': ['unhashable']}
+        self.assertEqual(self.ids(collection.find(
+            {'user.region': ['unhashable']})), [3])
+        del record.score
+        self.assertEqual(len(collection.range('score')), 9)
+        added = collection.add({'id': 10, 'user': {'region': 'eu'}})
+        self.assertIn(added, collection)
+        collection.remove(record)
+        self.assertNotIn(record, collection)
+        record.score = 1
+        self.assertEqual(len(collection.range('score')), 9)
+        self.assertEqual(self.ids(collection.find({'user.region': 'eu'})),
+                         [0, 2, 4, 6, 8, 10])
+        with self.assertRaises(ValueError):
+            collection.remove(record)
+
+    def test_indexes(self):
+        collection = self.collection
+        collection.add_index('id')
+        self.assertEqual(self.ids(collection.find(id=4)), [4])
+        memory = collection.index_memory()
+        self.assertEqual(sorted(memory), [('id', 'hash'), ('score', 'sorted'),
+                                          ('user.region', 'hash')])
+        self.assertTrue(all(size > 0 for size in memory.values()))
+        collection.drop_index('id')
+        self.assertEqual(len(collection.index_memory()), 2)
+        with self.assertRaises(ValueError):
+            collection.add_index('id', kind='btree')
+
+    def test_tracked_records_are_refused(self):
+        collection = self.collection
+        records = list(collection)
+        with self.assertRaises(ValueError):
+            Collection(records[:3], indexes=['user.region'])
+        with self.assertRaises(ValueError):
+            Collection().add(records[0].user)
+        records[0].user.region = 'zz'
+        self.assertEqual(self.ids(collection.find({'user.region': 'zz'})),
+                         [0])
+        tracked = track(Dict({'id': 10, 'user': {'region': 'eu'}}))
+        tracked.user.region = 'us'
+        with self.assertRaises(ValueError):
+            collection.add(tracked)
+        self.assertEqual(checkpoint(tracked), [
+            {'op': 'add', 'path': ('user', 'region'), 'value': 'us'}])
+        with self.assertRaises(ValueError):
+            track(records[1])
+        collection.remove(records[1])
+        self.assertIs(Collection([records[1]]).add(records[1]), records[1])
+        untrack(tracked)
+        self.assertIn(collection.add(tracked), collection)
+
+    def test_shared_subtrees_are_refused(self):
+        collection = self.collection
+        shared = collection.find(id=2)[0].user
+        record = Dict(id=10)
+        record.user = shared
+        with self.assertRaises(ValueError):
+            collection.add(record)
+        with self.assertRaises(ValueError):
+            track(record)
+        with self.assertRaises(ValueError):
+            collection.find(id=3)[0].user = shared
+        self.assertEqual(len(collection), 10)
+        self.assertEqual(collection.find(id=3)[0].user.region, 'us')
+        shared.region = 'us'
+        self.assertEqual(self.ids(collection.find({'user.region': 'eu'})),
+                         [0, 4, 6, 8])
+        record = collection.find(id=4)[0]
+        record.user = record.user
+        record.copy_of_user = record.user
+        self.assertEqual(self.ids(collection.find({'user.region': 'eu'})),
+                         [0, 4, 6, 8])
+
+    def test_unindexable_records_are_not_added(self):
+        collection = self.collection
+        with self.assertRaises(TypeError):
+            collection.add({'id': 10, 'user': {'region': 'eu'},
+                            'score': 1j})
+        self.assertEqual(len(collection), 10)
+        self.assertEqual(self.ids(collection.find({'user.region': 'eu'})),
+                         [0, 2, 4, 6, 8])
+        self.assertEqual(len(collection.range('score')), 10)
+        record = collection.find(id=1)[0]
+        record.score = 1j
+        with self.assertRaises(TypeError):
+            collection.range('score')
+        with self.assertRaises(TypeError):
+            collection.find(id=1)
+        record.score = 4
+        self.assertEqual(self.ids(collection.range('score', 4)), [1, 4, 9])
+
+
+class ProfilerTests(unittest.TestCase):
+
+    def rows(self, profiler, event):
+        return [row for row in profiler.stats() if row['event'] == event]
+
+    def test_counts_by_call_site(self):
+        events = []
+        with Profiler(callback=lambda *args: events.append(args)) as profiler:
+            prop = Dict({'a': {'b': [1, {'c': 2}]}, 'd': {}})
+            prop.x.y = 1
+            getattr(prop, 'missing', None)
+            prop.update({'a': {'e': {'f': 1}}})
+            prop.to_dict()
+            copy.deepcopy(prop)
+            CompactDict(a={'b': 1})
+        init = self.rows(profiler, 'init')
+        self.assertEqual(sorted(row['count'] for row in init), [2, 4, 5])
+        site = init[0]['site']
+        self.assertTrue(site.startswith(__file__.rstrip('c')), site)
+        self.assertIn('(test_counts_by_call_site)', site)
+        missing = sorted((row['count'], row['unattached'])
+                         for row in self.rows(profiler, 'missing'))
+        self.assertEqual(missing, [(1, 0), (1, 1)])
+        update, = self.rows(profiler, 'update')
+        self.assertEqual((update['count'], update['depth']), (1, 2))
+        self.assertEqual(self.rows(profiler, 'to_dict')[0]['count'], 1)
+        self.assertEqual(self.rows(profiler, 'deepcopy')[0]['count'], 5)
+        self.assertEqual(len(self.rows(profiler, 'hook:dict')), 2)
+        self.assertTrue(all(row['time'] >= 0 for row in profiler.stats()))
+        self.assertEqual(sum(event[3] for event in events), sum(
+            row['count'] for row in profiler.stats()) + 1)
+        profiler.reset()
+        with profiler:
+            Dict({'a': {'b': [1, 2], 'c': [{'x': [3]}]}})
+        counts = dict((row['event'], row['count'])
+                      for row in profiler.stats())
+        self.assertEqual((counts['hook:dict'], counts['hook:list']), (2, 3))
+        profiler.reset()
+        self.assertEqual(profiler.stats(), [])
+
+    def test_subclasses_convert_the_same_while_profiling(self):
+        class Lower(Dict):
+            def __init__(self, *args, **kwargs):
+                super(Lower, self).__init__(
+                    (key.lower(), value) for key, value in
+                    dict(*args, **kwargs).items())
+
+        with Profiler() as profiler:
+            lowered = Lower({'A': {'B': [{'C': 1}]}})
+            CompactDict({'a': {'b': 1}})
+        self.assertEqual(lowered, {'a': {'b': [{'c': 1}]}})
+        counts = [sum(row['count'] for row in self.rows(profiler, event))
+                  for event in ('hook:dict', 'hook:list')]
+        self.assertEqual(counts, [3, 1])
+        self.assertEqual(Dict({'a': {'b': [{'c': 1}]}}).to_dict(),
+                         {'a': {'b': [{'c': 1}]}})
+
+    def test_stop_restores_methods(self):
+        methods = [(cls, name, vars(cls)[name])
+                   for cls in (Dict, CompactDict)
+                   for name in ('__init__', '_hook', '__missing__', 'update',
+                                'to_dict', '__deepcopy__')]
+        profiler = Profiler().start()
+        with self.assertRaises(RuntimeError):
+            Profiler().start()
+        self.assertIsNot(vars(Dict)['__init__'], methods[0][2])
+        profiler.stop()
+        for cls, name, method in methods:
+            self.assertIs(vars(cls)[name], method)
+        Dict(a=1)
+        self.assertEqual(profiler.stats(), [])
+        with Profiler():
+            pass
+
+    def test_results_are_unchanged(self):
+        with Profiler():
+            prop = Dict(TEST_DICT)
+            prop.a.b.d = 1
+            prop.update({'a': {'e': 2}})
+            prop.freeze()
+            with self.assertRaises(KeyError):
+                prop.missing
+            prop.unfreeze()
+            copied = copy.deepcopy(prop)
+        self.assertEqual(copied.to_dict(),
+                         {'a': {'b': {'c': TEST_VAL, 'd': 1}, 'e': 2}})
+        self.assertIsNot(copied.a, prop.a)
+
+
+class MergeTests(unittest.TestCase):
+    layers = [{'a': {'x': 1, 'l': [1]}, 'b': 1, 'c': [{'d': 1}]},
+              {'a': {'y': 2, 'l': [2]}, 'c': {'z': 1}},
+              {'a': {'x': 3}, 'b': {'q': 1}}]
+
+    def test_merge_like_update(self):
+        expected = Dict()
+        for layer in self.layers:
+            expected.update(Dict(layer))
+        merged = merge(*self.layers)
+        self.assertEqual(merged, expected)
+        # keys come in the order update() gives them
+        self.assertEqual(list(merged.a), list(expected.a))
+        self.assertIsInstance(merged.a, Dict)
+        self.assertIsInstance(merged.c, Dict)
+        self.assertIsNot(merged.a.l, self.layers[1]['a']['l'])
+        self.assertEqual(merge(), {})
+
+    def test_strategies(self):
+        merger = Merger(lists='append', dict_class=ReadDict)
+        merged = merger.merge(self.layers)
+        self.assertEqual(merged.a.l, [1, 2])
+        self.assertIsInstance(merged.a, ReadDict)
+        with self.assertRaises(ValueError):
+            Merger(conflicts='error').merge(self.layers)
+        strict = Merger(lists='append', conflicts='error')
+        self.assertEqual(strict.merge([{'l': [1], 'k': {'m': 1}},
+                                       {'l': [2], 'k': {'m': 1}}]),
+                         {'l': [1, 2], 'k': {'m': 1}})
+        with self.assertRaises(ValueError):
+            Merger(lists='prepend')
+
+    def test_cache(self):
+        merger = Merger(cache_size=1)
+        layers = [FrozenDict(layer) for layer in self.layers]
+        first = merger.merge(layers)
+        first.a.x = 'changed'
+        second = merger.merge(layers)
+        self.assertEqual(second.a.x, 3)
+        self.assertEqual(merger.merge(self.layers[:1], key='v1'),
+                         self.layers[0])
+        self.assertEqual(merger.merge([], key='v1'), self.layers[0])
+        self.assertEqual(len(merger._cache), 1)
+        merger.clear_cache()
+        self.assertEqual(merger.merge([], key='v1'), {})
+
+
+class ChangeTrackingTests(unittest.TestCase):
+
+    def test_checkpoint_patch(self):
+        tree = Dict({'a': {'b': 1, 'c': {'d': 2}}, 'gone': 1, 'keep': [1]})
+        mirror = tree.to_dict()
+        self.assertIs(track(tree), tree)
+        tree.a.b = 5
+        tree.x.y.z = 1
+        del tree.gone
+        tree.a.c.d = 3
+        tree.a.c = Dict(new=1)
+        tree.a.c.new = 2
+        tree.tmp = 1
+        tree.pop('tmp')
+        tree.update({'a': {'u': 9}})
+        # the order of the operations follows the log, which is a dict
+        patch = sorted(checkpoint(tree), key=lambda op: op['path'])
+        self.assertEqual(patch, [
+            {'op': 'add', 'path': ('a', 'b'), 'value': 5},
+            {'op': 'add', 'path': ('a', 'c'), 'value': {'new': 2}},
+            {'op': 'add', 'path': ('a', 'u'), 'value': 9},
+            {'op': 'remove', 'path': ('gone',)},
+            {'op': 'add', 'path': ('x',), 'value': {'y': {'z': 1}}}])
+        self.assertIs(type(patch[4]['value']), dict)
+        self.assertEqual(apply_patch(mirror, patch), tree)
+        self.assertEqual(checkpoint(tree), [])
+
+    def test_removed_subtrees_stop_recording(self):
+        tree = track(Dict({'a': {'b': {'c': 1}}, 'd': {'e': 1}}))
+        old = tree.a.b
+        tree.a.b = 1
+        tree.d.clear()
+        checkpoint(tree)
+        old.c = 2
+        self.assertEqual(checkpoint(tree), [])
+        with self.assertRaises(ValueError):
+            checkpoint(tree.a)
+
+    def test_untrack_copy_and_pickle(self):
+        tree = track(ReadDict({'a': {'b': 1}}))
+        tree.a.c = 2
+        self.assertEqual(type(pickle.loads(pickle.dumps(tree)).a), ReadDict)
+        self.assertIs(type(tree.copy()), ReadDict)
+        copied = copy.deepcopy(tree)
+        self.assertIs(type(copied.a), ReadDict)
+        copied.a.b = 3
+        self.assertEqual(checkpoint(tree), [
+            {'op': 'add', 'path': ('a', 'c'), 'value': 2}])
+        self.assertIs(untrack(tree), tree)
+        self.assertIs(type(tree), ReadDict)
+        self.assertIs(type(tree.a), ReadDict)
+        with self.assertRaises(ValueError):
+            checkpoint(tree)
+        with self.assertRaises(TypeError):
+            track({})
+
+    def test_compact_dicts(self):
+        tree = Dict()
+        tree.a = CompactDict({'b': {'c': 1}})
+        track(tree)
+        self.assertIsInstance(tree.a.b, CompactDict)
+        tree.a.b.c = 2
+        tree.a.d = CompactDict(e=1)
+        tree.a.d.e = 3
+        self.assertEqual(sorted(checkpoint(tree), key=lambda op: op['path']), [
+            {'op': 'add', 'path': ('a', 'b', 'c'), 'value': 2},
+            {'op': 'add', 'path': ('a', 'd'), 'value': {'e': 3}}])
+        compact = track(CompactDict({'x': {'y': 1}}))
+        compact.x.y = 2
+        del compact.x
+        self.assertEqual(checkpoint(compact), [
+            {'op': 'remove', 'path': ('x',)}])
+        self.assertIs(type(copy.copy(compact)), CompactDict)
+        self.assertIs(type(copy.deepcopy(tree).a), CompactDict)
+        self.assertIs(type(pickle.loads(pickle.dumps(tree)).a.b),
+                      CompactDict)
+        untrack(tree)
+        self.assertIs(type(tree.a.d), CompactDict)
+        tree.a.d.e = 4
+        with self.assertRaises(ValueError):
+            checkpoint(tree)
+
+    def test_track_is_not_a_method(self):
+        prop = Dict(track=5, checkpoint=6, untrack=7)
+        self.assertEqual(prop.track, 5)
+        prop.track = 1
+        self.assertEqual(prop, {'track': 1, 'checkpoint': 6, 'untrack': 7})
+        track(prop)
+        prop.checkpoint = 8
+        self.assertEqual((prop.checkpoint, prop.untrack), (8, 7))
+        self.assertEqual(checkpoint(prop), [
+            {'op': 'add', 'path': ('checkpoint',), 'value': 8}])
+
+    def test_diff(self):
+        class Unequal(object):
+            def __eq__(self, other):
+                raise AssertionError('shared values are not compared')
+
+        shared = {'x': Unequal()}
+        old = Dict({'s': shared, 'k': 1, 'n': {'a': 1, 'b': 2}, 'gone': 1})
+        new = Dict({'s': shared, 'k': 2, 'n': {'a': 1, 'c': 3}, 'l': [1]})
+        patch = diff(old, new)
+        self.assertEqual(patch, [
+            {'op': 'remove', 'path': ('gone',)},
+            {'op': 'add', 'path': ('k',), 'value': 2},
+            {'op': 'add', 'path': ('l',), 'value': [1]},
+            {'op': 'remove', 'path': ('n', 'b')},
+            {'op': 'add', 'path': ('n', 'c'), 'value': 3}])
+        patched = apply_patch(Dict(old), patch)
+        self.assertEqual(patched, new)
+        self.assertIsInstance(patched.n, Dict)
+        with self.assertRaises(KeyError):
+            apply_patch(Dict(), [{'op': 'add', 'path': 'a.b', 'value': 1}])
+        with self.assertRaises(ValueError):
+            apply_patch(Dict(a=1), [{'op': 'move', 'path': 'a'}])
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_round_trip(self):
+        shared = {'shared': True}
+        tree = Dict({'a': {'b': [1, {'c': 2}, (3, [4])]}, 'x': shared,
+                     'y': shared, 1: None, 'big': 2 ** 80, 'raw': b'\0'})
+        write_snapshot(tree, self.path)
+        view = open_snapshot(self.path)
+        self.assertIsInstance(view, SnapshotDict)
+        self.assertEqual(view.a.b[1].c, 2)
+        self.assertEqual(view['a']['b'][2], (3, (4,)))
+        self.assertEqual(view[1], None)
+        self.assertEqual(view.big, 2 ** 80)
+        self.assertEqual(view.y, shared)
+        self.assertEqual(sorted(view.a), ['b'])
+        self.assertIn('raw', view)
+        self.assertEqual(len(view), 6)
+        self.assertEqual(view.to_dict()['a'], {'b': (1, {'c': 2}, (3, (4,)))})
+        thawed = view.thaw()
+        self.assertIsInstance(thawed.a.b[1], Dict)
+        thawed.a.new = 1
+
+    def test_read_only_and_missing_keys(self):
+        with open(self.path, 'wb') as fp:
+            write_snapshot({'a': {'b': 1}}, fp)
+        view = open_snapshot(self.path)
+        self.assertEqual(view.missing.deeper, {})
+        self.assertEqual(view['missing'], {})
+        self.assertIsNone(view.get('missing'))
+        self.assertEqual(view, {'a': {'b': 1}})
+        with self.assertRaises(TypeError):
+            view.a.b = 2
+        with self.assertRaises(TypeError):
+            view['a'] = 2
+        with self.assertRaises(TypeError):
+            view.missing.b = 2
+
+    def test_bad_input(self):
+        with open(self.path, 'wb') as fp:
+            fp.write(b'{"a": 1}')
+        with self.assertRaises(ValueError):
+            open_snapshot(self.path)
+        with self.assertRaises(TypeError):
+            write_snapshot(1, self.path)
+        with self.assertRaises(ValueError):
+            write_snapshot({'a': object()}, self.path)
+
+
+class ReadDictTests(unittest.TestCase):
+
+    def test_read_present_keys(self):
+        prop = ReadDict(TEST_DICT)
+        self.assertIsInstance(prop.a, ReadDict)
+        self.assertEqual(prop.a.b.c, TEST_VAL)
+        self.assertEqual(prop['a']['b']['c'], TEST_VAL)
+
+    def test_missing_keys_read_empty(self):
+        prop = ReadDict()
+        self.assertEqual(prop.x, {})
+        self.assertEqual(prop['x'], {})
+        self.assertEqual(prop.y.z, {})
+        self.assertFalse(prop.x)
+        self.assertIs(prop.x.get('y'), None)
+        self.assertEqual(prop, {})
+
+    def test_missing_keys_vivify_on_write(self):
+        prop = ReadDict()
+        prop.a.b = 1
+        prop.c['d'].e = 2
+        prop.f.update(g=3)
+        prop.h |= {'i': 4}
+        self.assertEqual(prop.j.setdefault('k', 5), 5)
+        self.assertEqual(prop, {'a': {'b': 1}, 'c': {'d': {'e': 2}},
+                                'f': {'g': 3}, 'h': {'i': 4}, 'j': {'k': 5}})
+        self.assertIsInstance(prop.c.d, ReadDict)
+        first, second = prop.x, prop.x
+        first.y = 1
+        second.z = 2
+        self.assertEqual(prop.x, {'y': 1, 'z': 2})
+        with self.assertRaises(AttributeError):
+            prop.a.to_dict = 1
+
+    def test_missing_keys_act_as_values(self):
+        prop = ReadDict()
+        for name in ('__html__', '_repr_html_', '_private'):
+            with self.assertRaises(AttributeError):
+                getattr(prop.x, name)
+        self.assertEqual(prop.x.to_dict(), {})
+        self.assertIs(type(prop.x.to_dict()), dict)
+        for value in (prop.x.copy(), copy.copy(prop.x), copy.deepcopy(prop.x),
+                      pickle.loads(pickle.dumps(prop.x))):
+            self.assertIs(type(value), ReadDict)
+            self.assertEqual(value, {})
+        self.assertEqual(copy.deepcopy(ReadDict(a=prop.x)), {'a': {}})
+        self.assertEqual(prop, {})
+
+    def test_write_to_parent(self):
+        prop = ReadDict()
+        prop.x += 1
+        prop.y = {'z': 1}
+        self.assertEqual(prop, {'x': 1, 'y': {'z': 1}})
+
+    def test_frozen_missing_raises(self):
+        prop = ReadDict({'a': {}})
+        prop.freeze()
+        with self.assertRaises(KeyError):
+            prop.a.missing
+
+    def test_lazy(self):
+        prop = ReadDict.lazy({'a': {'b': 1}})
+        self.assertIsInstance(prop.a, ReadDict)
+        self.assertEqual(prop.a.b, 1)
+        self.assertEqual(prop.a.missing, {})
+        prop.a.missing.c = 2
+        self.assertIsInstance(prop.a.missing, ReadDict)
+        self.assertEqual(prop.a.missing, {'c': 2})
+
 """
 Allow for these test cases to be run from the command line
 via `python test_addict.py`
 """
 if __name__ == '__main__':
-    test_classes = (DictTests, ChildDictTests)
+    test_classes = (DictTests, ChildDictTests, InternedDictTests,
+                    ProbingDictTests, SchemaDictTests, LazyDictTests,
+                    CompactDictTests, LazyCopyTests, FrozenDictTests,
+                    ColumnsTests, AggregatorTests, ParallelTests,
+                    ConcurrentDictTests, AsyncStreamTests, CollectionTests,
+                    ProfilerTests, MergeTests, ChangeTrackingTests,
+                    SnapshotTests, ReadDictTests)
     loader = unittest.TestLoader()
     runner = unittest.TextTestRunner(verbosity=2)
     for class_ in test_classes: